@@ -6,7 +6,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from lpm_kernel.api.services.user_llm_config_service import UserLLMConfigService
-from lpm_kernel.file_data.chroma_utils import detect_embedding_model_dimension, reinitialize_chroma_collections
+from lpm_kernel.file_data.chroma_utils import detect_embedding_model_dimension, get_collection_metadata, reinitialize_chroma_collections
 
 def init_chroma_db():
     chroma_path = os.getenv("CHROMA_PERSIST_DIRECTORY", "./data/chroma_db")
@@ -70,10 +70,7 @@ def init_chroma_db():
                 # Create collection if it doesn't exist
                 collection = client.create_collection(
                     name=collection_name,
-                    metadata={
-                        "hnsw:space": "cosine",
-                        "dimension": dimension
-                    }
+                    metadata=get_collection_metadata(dimension)
                 )
                 print(f"Successfully created collection '{collection_name}' with dimension {dimension}")
 
@@ -1,11 +1,14 @@
 import json
 import argparse
-import torch
+import functools
 
-from transformers import AutoTokenizer, AutoModelForCausalLM
-from datasets import Dataset
-from trl import DPOConfig, DPOTrainer
-from peft import LoraConfig, AutoPeftModelForCausalLM, get_peft_model
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# torch, transformers, datasets, trl and peft are imported inside the functions that use them,
+# so parsing arguments (e.g. --help) does not pay their multi-second import cost
 from datetime import datetime, timedelta
 # from clearml import Task
 
@@ -20,19 +23,39 @@ def get_east_eight_time_formatted():
 
 # task = Task.init(project_name="mind_dpo", task_name="qwen25-instruct-" + get_east_eight_time_formatted())
 
+@functools.lru_cache(maxsize=1)
+def get_supported_dtype():
+    """Return the dtype to load weights in: bfloat16 on GPUs that support it, float32 otherwise (CPU doesn't support bfloat16)."""
+    import torch
+
+    if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+        return torch.bfloat16
+    return torch.float32
+
 def training_data_processor(args, SYS = "You are a helpful assistant.\n\n"):
-    with open(args.training_data_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    training_data = {
-        "prompt": [
-            [
-                {"role": "system", "content": data_point['prompt']['system']},
-                {"role": "user", "content": data_point['prompt']['user']}
-            ] for data_point in data
-        ], 
-        "chosen": [data_point["chosen"] for data_point in data],
-        "rejected": [data_point["rejected"] for data_point in data]
-    }
+    from transformers import AutoTokenizer
+
+    if orjson is not None:
+        with open(args.training_data_path, "rb") as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(args.training_data_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    # Collect all three columns in a single pass over the dataset
+    training_data = {"prompt": [], "chosen": [], "rejected": []}
+    # The system prompt is normally identical across rows, so share one message dict per distinct prompt
+    system_messages = {}
+    for data_point in data:
+        system_content = data_point['prompt']['system']
+        system_message = system_messages.get(system_content)
+        if system_message is None:
+            system_message = system_messages[system_content] = {"role": "system", "content": system_content}
+        training_data["prompt"].append([
+            system_message,
+            {"role": "user", "content": data_point['prompt']['user']}
+        ])
+        training_data["chosen"].append(data_point["chosen"])
+        training_data["rejected"].append(data_point["rejected"])
     tokenizer = AutoTokenizer.from_pretrained(args.base_model_path, padding_side="left")
     training_data = {
         "prompt": tokenizer.apply_chat_template(training_data["prompt"], tokenize=False),
@@ -42,12 +65,20 @@ def training_data_processor(args, SYS = "You are a helpful assistant.\n\n"):
     return training_data
 
 def train(args):
+    import torch
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+    from datasets import Dataset
+    from trl import DPOConfig, DPOTrainer
+    from peft import LoraConfig
+
     tokenizer = AutoTokenizer.from_pretrained(args.base_model_path, padding_side="left")
+    # Full fine-tuning keeps float32 master weights, small AdamW updates are lost to bf16 rounding;
+    # bf16 compute then comes from the DPOConfig autocast
     model = AutoModelForCausalLM.from_pretrained(
     args.base_model_path, 
     trust_remote_code=True,
     ignore_mismatched_sizes=True, 
-    torch_dtype=torch.float32,  # CPU doesn't support bfloat16
+    torch_dtype=torch.float32 if args.lora_r == 0 else get_supported_dtype(),
 )
     time_str = get_east_eight_time_formatted()
 
@@ -69,12 +100,16 @@ def train(args):
             task_type="CAUSAL_LM",
         )
 
+    # Mixed precision and activation checkpointing only pay off on GPU; CPU training keeps full precision
+    use_cuda = torch.cuda.is_available()
+    use_bf16 = use_cuda and get_supported_dtype() == torch.bfloat16
+
     training_args = DPOConfig(
         num_train_epochs=args.num_train_epochs,
         learning_rate=args.learning_rate,
         per_device_train_batch_size=args.batch_size,
-        gradient_checkpointing=False,
-        gradient_checkpointing_kwargs={"use_reentrant":True},
+        gradient_checkpointing=use_cuda,
+        gradient_checkpointing_kwargs={"use_reentrant":False},
         max_grad_norm=args.max_grad_norm,
         lr_scheduler_type="cosine",
         logging_steps=5,
@@ -88,8 +123,8 @@ def train(args):
         seed=42,
         output_dir="resources/model/output/dpo_model/adapter",
         remove_unused_columns=False,
-        fp16=False, 
-        bf16=False,
+        fp16=use_cuda and not use_bf16,
+        bf16=use_bf16,
         beta=args.beta,
     )
 
@@ -9,6 +9,7 @@ class ErrorCodes:
     NOT_FOUND = 404
     INTERNAL_ERROR = 500
     CONFIGURATION_ERROR = 501
+    SERVICE_UNAVAILABLE = 503
     PATH_NOT_FOUND = 10404
 
 
@@ -387,6 +387,8 @@ class CloudTrainProcessService(TrainProcessService):
         """Start the cloud training process using CloudService"""
         self.is_stopped = False
         self._data_processing_result = None
+        self._clear_documents_cache()
+        self._training_params_cache = None
 
         self.current_pid = os.getpid()
         logger.info(f"Cloud training process started with PID: {self.current_pid}")
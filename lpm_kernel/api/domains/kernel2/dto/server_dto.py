@@ -22,6 +22,7 @@ class ServerStatus:
 
     is_running: bool  # if service is running
     process_info: Optional[ProcessInfo] = None  # process info
+    pending_requests: int = 0  # requests waiting for a free inference slot
 
     @classmethod
     def not_running(cls) -> "ServerStatus":
@@ -29,6 +30,6 @@ class ServerStatus:
         return cls(is_running=False)
 
     @classmethod
-    def running(cls, process_info: ProcessInfo) -> "ServerStatus":
+    def running(cls, process_info: ProcessInfo, pending_requests: int = 0) -> "ServerStatus":
         """create a ServerStatus object representing a running server"""
-        return cls(is_running=True, process_info=process_info)
+        return cls(is_running=True, process_info=process_info, pending_requests=pending_requests)
@@ -17,6 +17,7 @@ from lpm_kernel.L1.serializers import NotesStorage
 from lpm_kernel.L1.utils import save_true_topics
 from lpm_kernel.L2.l2_generator import L2Generator
 from lpm_kernel.L2.utils import save_hf_model
+from lpm_kernel.api.common.errors import APIError
 from lpm_kernel.api.common.responses import APIResponse
 from lpm_kernel.api.domains.kernel2.dto.chat_dto import (
     ChatRequest,
@@ -102,7 +103,7 @@ def health_check():
     config = Config.from_env()
     app_name = config.app_name or "Service"  # Add default value to prevent None
 
-    status = local_llm_service.get_server_status()
+    status = local_llm_service.get_server_status(detailed=True)
     if status.is_running and status.process_info:
         return jsonify(
             APIResponse.success(
@@ -112,6 +113,7 @@ def health_check():
                     "cpu_percent": status.process_info.cpu_percent,
                     "memory_percent": status.process_info.memory_percent,
                     "uptime": time.time() - status.process_info.create_time,
+                    "pending_requests": status.pending_requests,
                 }
             )
         )
@@ -826,7 +828,7 @@ def get_llama_server_status():
     """Get llama-server service status with service file information"""
     try:
         # Get llama server status
-        status = local_llm_service.get_server_status()
+        status = local_llm_service.get_server_status(detailed=True)
         
         # Get service status from file
         service_status = get_service_status()
@@ -1012,16 +1014,32 @@ def chat(body: ChatRequest):
                 request=body,
                 stream=body.stream,  # Respect the stream parameter from request
                 json_response=False,
-                strategy_chain=[BasePromptStrategy, RoleBasedStrategy, KnowledgeEnhancedStrategy]
+                strategy_chain=[BasePromptStrategy, RoleBasedStrategy, KnowledgeEnhancedStrategy],
+                raw_stream=True,
             )
             
             # Handle streaming or non-streaming response appropriately
             if body.stream:
-                return local_llm_service.handle_stream_response(response)
+                # llama-server already emits OpenAI SSE, so its events are forwarded as they are
+                return local_llm_service.handle_raw_stream_response(response)
             else:
                 # For non-streaming, return the complete response as JSON
                 return jsonify(response)
 
+        except APIError as e:
+            # No inference slot became free in time
+            logger.warning(f"Chat request rejected: {e.message}")
+            error_response = {
+                "error": {
+                    "message": e.message,
+                    "type": "server_error",
+                    "code": "service_unavailable"
+                }
+            }
+            if not body.stream:
+                return jsonify(error_response), e.code
+            return local_llm_service.handle_stream_response(iter([error_response]))
+
         except ValueError as e:
             error_msg = str(e)
             logger.error(f"Value error: {error_msg}")
@@ -16,6 +16,7 @@ from typing import Iterator, Any
 from flask import Blueprint, request, Response, jsonify
 from flask_pydantic import validate
 
+from lpm_kernel.api.common.errors import APIError
 from lpm_kernel.api.common.responses import APIResponse
 from lpm_kernel.api.services.local_llm_service import local_llm_service
 from lpm_kernel.api.domains.kernel2.dto.chat_dto import ChatRequest
@@ -62,8 +63,17 @@ def chat(body: ChatRequest):
                 request=body,
                 stream=True,
                 json_response=False,
+                raw_stream=True,
             )
-            return local_llm_service.handle_stream_response(response)
+            # Forward the server's SSE events without parsing each chunk into a pydantic model;
+            # the stream's inference slot is released even if the response is never read
+            return local_llm_service.handle_raw_stream_response(response)
+
+        except APIError as e:
+            # No inference slot became free in time
+            logger.warning(f"Chat request rejected: {e.message}")
+            error_response = APIResponse.error(e.message, code=e.code)
+            return local_llm_service.handle_stream_response(iter([{"error": error_response}]))
 
         except Exception as e:
             logger.error(f"API call failed: {str(e)}", exc_info=True)
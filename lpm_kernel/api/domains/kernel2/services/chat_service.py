@@ -272,6 +272,11 @@ class ChatService:
         except Exception as e:
             logger.error(f"Error collecting stream response: {str(e)}", exc_info=True)
             return None
+        finally:
+            # Frees the inference slot held by local streams, even when a chunk failed to process
+            close = getattr(response_iterator, "close", None)
+            if close is not None:
+                close()
 
     def chat(
             self,
@@ -282,6 +287,7 @@ class ChatService:
             client: Optional[Any] = None,
             model_params: Optional[Dict[str, Any]] = None,
             context: Optional[Any] = None,
+            raw_stream: bool = False,
         ) -> Union[Dict[str, Any], Iterator[Dict[str, Any]]]:
         """
         Main chat method supporting both streaming and non-streaming responses
@@ -294,6 +300,8 @@ class ChatService:
             client: Optional OpenAI client to use. If None, uses local_llm_service.client
             model_params: Optional model specific parameters to override defaults
             context: Optional context to pass to strategies
+            raw_stream: With stream, return the upstream HTTP response without parsing its
+                chunks, for forwarding with local_llm_service.handle_raw_stream_response
             
         Returns:
             Either an iterator for streaming responses or a single response dictionary
@@ -341,15 +349,32 @@ class ChatService:
         # logger.info(f"Using model parameters: {api_params}")
         
         # Call LLM API
+        # Requests to the local server wait for a free slot instead of overloading it, also
+        # when the caller passed local_llm_service.client explicitly
+        use_local_slot = client is None or local_llm_service.is_local_client(client)
+        if use_local_slot:
+            local_llm_service.acquire_inference_slot()
         try:
-            response = current_client.chat.completions.create(**api_params)
+            if stream and raw_stream:
+                # The server already speaks OpenAI SSE, skip building a pydantic model per chunk
+                raw_response = current_client.chat.completions.with_raw_response.create(**api_params)
+                response = raw_response.http_response
+            else:
+                response = current_client.chat.completions.create(**api_params)
             if not stream:
                 logger.info(f"Response: {response.json() if hasattr(response, 'json') else response}")
+            elif use_local_slot:
+                # The slot stays taken while the stream is being read
+                response = local_llm_service.hold_slot_for_stream(response)
+                use_local_slot = False
             return response
             
         except Exception as e:
             logger.error(f"Chat failed: {str(e)}", exc_info=True)
             raise
+        finally:
+            if use_local_slot:
+                local_llm_service.release_inference_slot()
 
 
 # Global chat service instance
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import List
+from typing import Dict, List
 
 
 class ProcessStep(Enum):
@@ -40,6 +40,30 @@ class ProcessStep(Enum):
             cls.CONVERT_MODEL,
         ]
         
+    @classmethod
+    def get_step_dependencies(cls) -> Dict["ProcessStep", List["ProcessStep"]]:
+        """Get the steps each step depends on
+
+        The model download only fetches weights, so it can run alongside the memory
+        and biography steps until the L2 data steps need it.
+        """
+        return {
+            cls.MODEL_DOWNLOAD: [],
+            cls.LIST_DOCUMENTS: [],
+            cls.GENERATE_DOCUMENT_EMBEDDINGS: [cls.LIST_DOCUMENTS],
+            cls.CHUNK_DOCUMENT: [cls.GENERATE_DOCUMENT_EMBEDDINGS],
+            cls.CHUNK_EMBEDDING: [cls.CHUNK_DOCUMENT],
+            cls.EXTRACT_DIMENSIONAL_TOPICS: [cls.CHUNK_EMBEDDING],
+            cls.GENERATE_BIOGRAPHY: [cls.EXTRACT_DIMENSIONAL_TOPICS],
+            cls.MAP_ENTITY_NETWORK: [cls.GENERATE_BIOGRAPHY, cls.MODEL_DOWNLOAD],
+            cls.DECODE_PREFERENCE_PATTERNS: [cls.MAP_ENTITY_NETWORK],
+            cls.REINFORCE_IDENTITY: [cls.DECODE_PREFERENCE_PATTERNS],
+            cls.AUGMENT_CONTENT_RETENTION: [cls.REINFORCE_IDENTITY],
+            cls.TRAIN: [cls.AUGMENT_CONTENT_RETENTION],
+            cls.MERGE_WEIGHTS: [cls.TRAIN],
+            cls.CONVERT_MODEL: [cls.MERGE_WEIGHTS],
+        }
+
     def get_method_name(self) -> str:
         """Get the corresponding method name for this step"""
         return self.value
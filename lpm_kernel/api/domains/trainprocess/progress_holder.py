@@ -1,6 +1,8 @@
+from contextlib import contextmanager
 from enum import Enum
 import json
 import os
+import threading
 from typing import Dict, List, Optional
 
 from lpm_kernel.api.domains.trainprocess.progress_enum import Status
@@ -10,6 +12,9 @@ from lpm_kernel.configs.logging import get_train_process_logger
 
 logger = get_train_process_logger()
 
+# Inside batch_mode, deferred status changes are written to the progress file at least this often (seconds)
+BATCH_FLUSH_INTERVAL = 2.0
+
 class TrainProgressHolder:
     """Progress management class"""
 
@@ -27,6 +32,12 @@ class TrainProgressHolder:
         if not self.progress_file.startswith(progress_dir):
             raise ValueError("Invalid progress file path")
         self.progress = TrainProgress()
+        # Independent steps may report their status from different threads
+        self._lock = threading.Lock()
+        # Write-behind state used by batch_mode
+        self._batch_depth = 0
+        self._dirty = False
+        self._flush_timer = None
 
         # Stage mapping for process steps
         self._stage_mapping = {
@@ -105,9 +116,8 @@ class TrainProgressHolder:
         
         # Save changes if any were made
         if need_save:
-            progress_dict = self.progress.to_dict()
-            with open(self.progress_file, "w") as f:
-                json.dump(progress_dict, f, indent=2)
+            with self._lock:
+                self._flush_locked()
             logger.info("Saved progress after resetting in_progress statuses")
 
     def _save_progress(self):
@@ -132,13 +142,60 @@ class TrainProgressHolder:
         """
         stage_name = self._stage_mapping[step]
         step_name = step.value
-        self.progress.update_progress(stage_name, step_name, status)
+        with self._lock:
+            self.progress.update_progress(stage_name, step_name, status)
+            if self._batch_depth and status in (Status.PENDING, Status.IN_PROGRESS):
+                # Completed, failed and suspended states are always written right away, so a
+                # crash can only lose a step having been started
+                self._dirty = True
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(BATCH_FLUSH_INTERVAL, self._flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+            else:
+                self._flush_locked()
+
+    @contextmanager
+    def batch_mode(self):
+        """Defer writing non-terminal status changes to the progress file until the batch ends
+
+        Pending changes are also flushed by any terminal status change and at least every
+        BATCH_FLUSH_INTERVAL seconds.
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._dirty:
+                    self._flush_locked()
+
+    def _flush(self):
+        """Write deferred status changes; called from the flush timer"""
+        with self._lock:
+            if self._flush_timer is not threading.current_thread():
+                # Cancelled after it had already fired, and possibly replaced by a newer timer
+                return
+            self._flush_timer = None
+            if self._dirty:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        """Write progress to file, the caller must hold the lock"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
         self._save_progress()
+        self._dirty = False
 
     def reset_progress(self):
         """Reset all progress"""
-        self.progress = TrainProgress()
-        self._save_progress()
+        with self._lock:
+            self.progress = TrainProgress()
+            # Also cancels a pending deferred flush, which would write the old progress back
+            self._flush_locked()
 
     def get_last_successful_step(self) -> Optional[ProcessStep]:
         """Get the last successfully completed step"""
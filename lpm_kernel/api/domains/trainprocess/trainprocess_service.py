@@ -1,10 +1,16 @@
+import functools
+import hashlib
 import json
+import logging
 import os
+import pickle
+import shutil
 import re
 import time
 from flask import jsonify
+from sqlalchemy import func
 import psutil
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 from lpm_kernel.L1.utils import save_true_topics
 from lpm_kernel.L1.serializers import NotesStorage
 from lpm_kernel.kernel.note_service import NoteService
@@ -23,14 +29,18 @@ from lpm_kernel.kernel.l1.l1_manager import (
 )
 from lpm_kernel.api.common.script_executor import ScriptExecutor
 from lpm_kernel.configs.config import Config
-from lpm_kernel.file_data.chunker import DocumentChunker
+from lpm_kernel.file_data.chunker import DocumentChunker, get_chunker, split_content
 from lpm_kernel.kernel.l1.l1_manager import generate_l1_from_l0
 import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+import multiprocessing
 from lpm_kernel.api.domains.trainprocess.progress_enum import Status
 from lpm_kernel.api.domains.trainprocess.process_step import ProcessStep
 from lpm_kernel.api.domains.trainprocess.progress_holder import TrainProgressHolder
 from lpm_kernel.api.domains.trainprocess.training_params_manager import TrainingParamsManager
-from lpm_kernel.models.l1 import L1Bio, L1Shade
+from lpm_kernel.models.l1 import L1Bio, L1Shade, L1Version
+from lpm_kernel.models.status_biography import StatusBiography
+from lpm_kernel.file_data.models import DocumentModel
 from lpm_kernel.common.repository.database_session import DatabaseSession
 from lpm_kernel.api.domains.kernel.routes import store_l1_data
 from lpm_kernel.api.domains.trainprocess.L1_exposure_manager import output_files, query_l1_version_data, read_file_content
@@ -39,28 +49,57 @@ import subprocess
 from lpm_kernel.configs.logging import get_train_process_logger, TRAIN_LOG_FILE
 logger = get_train_process_logger()
 
+# Total document size from which chunking is spread over worker processes instead of threads
+CHUNK_PROCESS_POOL_MIN_CHARS = 1_000_000
+
+# On-disk cache of the notes and basic info derived for L2 generation, inside the resources directory
+L2_CACHE_DIRNAME = "l2_cache"
+
+def _get_chunker() -> DocumentChunker:
+    """Return the document chunker for the configured chunk size and overlap
+
+    Chunkers are cached per (chunk_size, overlap), so a changed configuration is picked up
+    by the next run instead of being ignored until a restart.
+    """
+    config = Config.from_env()
+    return get_chunker(
+        int(config.get("DOCUMENT_CHUNK_SIZE")),
+        int(config.get("DOCUMENT_CHUNK_OVERLAP")),
+    )
+
 class TrainProcessService:
     """Training process service (singleton pattern)"""
     
     _instance = None
     _initialized = False
+    # Reentrant because subclasses create their instance through this __new__
+    _lock = threading.RLock()
     
     def __new__(cls, *args, **kwargs):
+        # Only take the lock while the instance does not exist yet
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
         return cls._instance
 
     def __init__(self, current_model_name: str):
         if current_model_name is None:
             raise ValueError("current_model_name cannot be None")
             
+        with self._lock:
+            self._initialize(current_model_name)
+
+    def _initialize(self, current_model_name: str):
+        """Set up instance state once, and switch progress when the model name changes"""
         if not self._initialized:
             # Generate a unique progress file name based on model name
             self.progress = TrainProgressHolder(current_model_name)
             self.model_name = current_model_name  # Set model name directly
             self._initialized = True
             
-            # Initialize stop flag
+            # Initialize stop flag, backed by an event so long-running steps can check it cheaply
+            self._stop_event = threading.Event()
             self.is_stopped = False
             self.current_step = None
             
@@ -75,6 +114,21 @@ class TrainProcessService:
                 "config_path": None
             }
             self.l2_data_prepared = False
+
+            # Documents listed during the current run, shared by the steps that need them
+            self._documents_cache = None
+            self._document_dicts_cache = None
+
+            # Training parameters of the current run, read once from TrainingParamsManager
+            self._training_params_cache = None
+
+            # Resolve the working directory once, so the steps share the same paths
+            self._base_dir = os.getcwd()
+            self._resources_dir = os.path.join(self._base_dir, "resources")
+            self._l2_cache_dir = os.path.join(self._resources_dir, L2_CACHE_DIRNAME)
+
+            # L2Generator instances shared by the L2 data steps, keyed by (data_path, is_cot)
+            self._l2_generators: Dict[Tuple[str, bool], L2Generator] = {}
         
         # Update model name and progress instance if model name changes
         if current_model_name != self.model_name:
@@ -100,8 +154,9 @@ class TrainProcessService:
         
         if current_model_name is not None:
             # Update the existing instance with new model name
-            cls._instance.model_name = current_model_name
-            cls._instance.progress = TrainProgressHolder(current_model_name)
+            with cls._lock:
+                cls._instance.model_name = current_model_name
+                cls._instance.progress = TrainProgressHolder(current_model_name)
             
         return cls._instance
 
@@ -110,44 +165,91 @@ class TrainProcessService:
         try:
             # Mark step as in progress
             self.progress.mark_step_status(ProcessStep.LIST_DOCUMENTS, Status.IN_PROGRESS)            
-            # Directly call document service instead of API
-            documents = document_service.list_documents()
+            if self._document_dicts_cache is None:
+                self._document_dicts_cache = [doc.to_dict() for doc in self._get_documents()]
             # Mark step as completed if we found documents
             self.progress.mark_step_status(ProcessStep.LIST_DOCUMENTS, Status.COMPLETED)
                 
-            return [doc.to_dict() for doc in documents]
+            return self._document_dicts_cache
         except Exception as e:
             logger.error(f"List documents failed: {str(e)}")
             self.progress.mark_step_status(ProcessStep.LIST_DOCUMENTS, Status.FAILED)
             return []
 
+    def list_document_ids(self):
+        """List the IDs of all documents, without copying their content"""
+        if self._documents_cache is not None:
+            return [doc.id for doc in self._documents_cache]
+        return document_service.list_document_ids()
+
+    def _get_training_params(self) -> dict:
+        """Return the training parameters of the current run, reading them only once per run"""
+        if self._training_params_cache is None:
+            self._training_params_cache = TrainingParamsManager.get_latest_training_params()
+        return self._training_params_cache
+
+    def _get_l2_generator(self, is_cot: bool = False) -> L2Generator:
+        """Return the L2Generator shared by the L2 data steps for the given is_cot setting"""
+        key = (self._resources_dir, is_cot)
+        if key not in self._l2_generators:
+            self._l2_generators[key] = L2Generator(data_path=self._resources_dir, is_cot=is_cot)
+        return self._l2_generators[key]
+
+    def _get_documents(self):
+        """Return the documents of the current run, querying the database only once per run"""
+        if self._documents_cache is None:
+            # Directly call document service instead of API
+            self._documents_cache = document_service.list_documents()
+        return self._documents_cache
+
+    def _clear_documents_cache(self):
+        """Forget the cached document list so the next run sees newly uploaded documents"""
+        self._documents_cache = None
+        self._document_dicts_cache = None
+
     def generate_document_embeddings(self) -> bool:
         """Process embeddings for all documents"""
         try:
             # Mark step as in progress
             self.progress.mark_step_status(ProcessStep.GENERATE_DOCUMENT_EMBEDDINGS, Status.IN_PROGRESS)
             
-            unembedding_docs = document_service._repository.find_unembedding()
-            logger.info(f"Found {len(unembedding_docs)} documents that need embedding generation")
+            unembedding_doc_ids = document_service._repository.find_unembedding_ids()
+            logger.info(f"Found {len(unembedding_doc_ids)} documents that need embedding generation")
             
-            if not unembedding_docs:
+            if not unembedding_doc_ids:
                 logger.info("No documents need embedding generation, marking step as completed")
                 self.progress.mark_step_status(ProcessStep.GENERATE_DOCUMENT_EMBEDDINGS, Status.COMPLETED)
                 return True
                 
-            for doc in unembedding_docs:
-                doc_id = doc.id
-
+            # Embedding calls are I/O-bound, so overlap them across documents. Keep the pool small
+            # to avoid exhausting DB connections and the embedding backend.
+            max_workers = int(os.getenv("EMBED_CONCURRENCY", "8"))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 # Directly call document service instead of API
-                embedding = document_service.process_document_embedding(doc_id)
-                if embedding is None:
-                    logger.error(
-                        f"Generate document embeddings failed for doc_id: {doc_id}"
-                    )
-                    self.progress.mark_step_status(ProcessStep.GENERATE_DOCUMENT_EMBEDDINGS, Status.FAILED)
-                    return False
-                logger.info(f"Successfully generated embedding for document {doc_id}")
-            
+                futures = {
+                    executor.submit(document_service.process_document_embedding, doc_id): doc_id
+                    for doc_id in unembedding_doc_ids
+                }
+                try:
+                    for future in as_completed(futures):
+                        if self._suspend_if_stopped(ProcessStep.GENERATE_DOCUMENT_EMBEDDINGS, futures):
+                            return False
+                        doc_id = futures[future]
+                        embedding = future.result()
+                        if embedding is None:
+                            logger.error(
+                                f"Generate document embeddings failed for doc_id: {doc_id}"
+                            )
+                            for pending in futures:
+                                pending.cancel()
+                            self.progress.mark_step_status(ProcessStep.GENERATE_DOCUMENT_EMBEDDINGS, Status.FAILED)
+                            return False
+                        logger.info(f"Successfully generated embedding for document {doc_id}")
+                except Exception:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+
             self.progress.mark_step_status(ProcessStep.GENERATE_DOCUMENT_EMBEDDINGS, Status.COMPLETED)
             return True
         except Exception as e:
@@ -160,42 +262,64 @@ class TrainProcessService:
         try:
             # Mark step as in progress
             self.progress.mark_step_status(ProcessStep.CHUNK_DOCUMENT, Status.IN_PROGRESS)
-            config = Config.from_env()
-            chunker = DocumentChunker(
-                chunk_size=int(config.get("DOCUMENT_CHUNK_SIZE")),
-                overlap=int(config.get("DOCUMENT_CHUNK_OVERLAP")),
-            )
-            documents = document_service.list_documents()
+            chunker = _get_chunker()
+            # Reuse the documents already listed in this run; otherwise let the database
+            # filter out documents without content
+            if self._documents_cache is not None:
+                documents = [doc for doc in self._documents_cache if doc.raw_content]
+            else:
+                documents = document_service.list_documents_with_content()
             processed, failed, skipped = 0, 0, 0
 
-            chunk_service = ChunkService()
+            pending_docs = []
             for doc in documents:
-                try:
-                    existing_chunks = document_service._repository.find_chunks(doc.id)
-                    if existing_chunks and len(existing_chunks) > 0:
-                        logger.info(f"Document {doc.id} already has {len(existing_chunks)} chunks, skipping...")
-                        skipped += 1
-                        continue
-                        
-                    if not doc.raw_content:
-                        logger.warning(f"Document {doc.id} has no content, skipping...")
-                        failed += 1
-                        continue
+                existing_chunks = document_service._repository.find_chunks(doc.id)
+                if existing_chunks and len(existing_chunks) > 0:
+                    logger.info(f"Document {doc.id} already has {len(existing_chunks)} chunks, skipping...")
+                    skipped += 1
+                    continue
+                pending_docs.append(doc)
 
-                    # Split into chunks and save
-                    chunks = chunker.split(doc.raw_content)
-                    for chunk in chunks:
-                        chunk.document_id = doc.id
-                        chunk_service.save_chunk(chunk)
+            # Splitting is CPU-bound Python code, so large batches are split in worker processes to
+            # get around the GIL. Smaller batches stay on threads, where process startup isn't paid.
+            if sum(len(doc.raw_content) for doc in pending_docs) >= CHUNK_PROCESS_POOL_MIN_CHARS:
+                executor = ProcessPoolExecutor(
+                    max_workers=min(self._get_max_workers(), os.cpu_count() or 1),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                split = functools.partial(
+                    split_content, chunk_size=chunker.chunk_size, overlap=chunker.overlap
+                )
+            else:
+                executor = ThreadPoolExecutor(max_workers=self._get_max_workers())
+                split = chunker.split
+
+            chunk_service = ChunkService()
+            # Save chunks from this thread only so the DB writes do not contend with each other
+            with executor:
+                futures = {
+                    executor.submit(split, doc.raw_content): doc
+                    for doc in pending_docs
+                }
+
+                for future in as_completed(futures):
+                    if self._suspend_if_stopped(ProcessStep.CHUNK_DOCUMENT, futures):
+                        return False
+                    doc = futures[future]
+                    try:
+                        chunks = future.result()
+                        for chunk in chunks:
+                            chunk.document_id = doc.id
+                        chunk_service.save_chunks(chunks)
+
+                        processed += 1
+                        logger.info(
+                            f"Document {doc.id} processed: {len(chunks)} chunks created"
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to process document {doc.id}: {str(e)}")
+                        failed += 1
 
-                    processed += 1
-                    logger.info(
-                        f"Document {doc.id} processed: {len(chunks)} chunks created"
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to process document {doc.id}: {str(e)}")
-                    failed += 1      
-            
             logger.info(f"Chunk processing completed: {processed} processed, {skipped} skipped, {failed} failed")
             self.progress.mark_step_status(ProcessStep.CHUNK_DOCUMENT, Status.COMPLETED)
             return True
@@ -204,26 +328,72 @@ class TrainProcessService:
             self.progress.mark_step_status(ProcessStep.CHUNK_DOCUMENT, Status.FAILED)
             return False
 
+    @property
+    def is_stopped(self) -> bool:
+        """Whether a stop of the training process has been requested"""
+        return self._stop_event.is_set()
+
+    @is_stopped.setter
+    def is_stopped(self, value: bool):
+        if value:
+            self._stop_event.set()
+        else:
+            self._stop_event.clear()
+
+    def _suspend_if_stopped(self, step: ProcessStep, futures) -> bool:
+        """Cancel the not yet started work of a step and mark it suspended if a stop was requested
+
+        Args:
+            step: The process step that is running
+            futures: Futures submitted by the step
+
+        Returns:
+            bool: True if the step should stop, False otherwise
+        """
+        if not self._stop_event.is_set():
+            return False
+        logger.info(f"Training process stopped, suspending step: {step.value}")
+        for future in futures:
+            future.cancel()
+        self.progress.mark_step_status(step, Status.SUSPENDED)
+        return True
+
+    def _get_max_workers(self) -> int:
+        """Number of documents handled concurrently by the chunking and chunk embedding steps"""
+        concurrency_threads = os.getenv("CONCURRENCY_THREADS")
+        if concurrency_threads and concurrency_threads.isdigit() and int(concurrency_threads) > 0:
+            return int(concurrency_threads)
+        return int(os.getenv("EMBED_CONCURRENCY", "8"))
+
     def chunk_embedding(self) -> bool:
         """Process embeddings for all document chunks"""
         try:
             # Mark step as in progress
             self.progress.mark_step_status(ProcessStep.CHUNK_EMBEDDING, Status.IN_PROGRESS)
-            documents = self.list_documents()
-            for doc in documents:
-                doc_id = doc.get("id")
-                try:
-                    # Directly call document service to generate chunk embeddings
-                    processed_chunks = document_service.generate_document_chunk_embeddings(doc_id)
-                    if not processed_chunks:
-                        logger.warning(f"No chunks to process for document: {doc_id}")
-                        continue
-                except Exception as e:
-                    logger.error(
-                        f"Generate chunk embeddings failed for doc_id: {doc_id}: {str(e)}"
-                    )
-                    self.progress.mark_step_status(ProcessStep.CHUNK_EMBEDDING, Status.FAILED)
-                    return False
+            document_ids = self.list_document_ids()
+            with ThreadPoolExecutor(max_workers=self._get_max_workers()) as executor:
+                # Directly call document service to generate chunk embeddings
+                futures = {
+                    executor.submit(document_service.generate_document_chunk_embeddings, doc_id): doc_id
+                    for doc_id in document_ids
+                }
+                for future in as_completed(futures):
+                    if self._suspend_if_stopped(ProcessStep.CHUNK_EMBEDDING, futures):
+                        return False
+                    doc_id = futures[future]
+                    try:
+                        processed_chunks = future.result()
+                        if not processed_chunks:
+                            logger.warning(f"No chunks to process for document: {doc_id}")
+                            continue
+                    except Exception as e:
+                        logger.error(
+                            f"Generate chunk embeddings failed for doc_id: {doc_id}: {str(e)}"
+                        )
+                        for pending in futures:
+                            pending.cancel()
+                        self.progress.mark_step_status(ProcessStep.CHUNK_EMBEDDING, Status.FAILED)
+                        return False
             # All documents' chunks processed successfully
             self.progress.mark_step_status(ProcessStep.CHUNK_EMBEDDING, Status.COMPLETED)
             return True
@@ -289,12 +459,16 @@ class TrainProcessService:
             logger.info(f"Starting model download: {self.model_name}")
             
             # Start monitoring the download progress in a separate thread
+            self._download_done = threading.Event()
             monitor_thread = threading.Thread(target=self._monitor_model_download)
             monitor_thread.daemon = True
             monitor_thread.start()
             
-            # Start the actual download
-            model_path = save_hf_model(self.model_name)
+            # Start the actual download, and let the monitor exit once it returns or fails
+            try:
+                model_path = save_hf_model(self.model_name)
+            finally:
+                self._download_done.set()
             
             if model_path and os.path.exists(model_path):
                 logger.info(f"Model downloaded successfully to {model_path}")
@@ -320,9 +494,8 @@ class TrainProcessService:
             # Get or prepare L2 data
             self._prepare_l2_data()
 
-            l2_generator = L2Generator(
-                data_path=os.path.join(os.getcwd(), "resources")
-            )
+            training_params = self._get_training_params()
+            l2_generator = self._get_l2_generator(is_cot=training_params.get("is_cot", False))
             l2_generator.data_preprocess(self.l2_data["notes"], self.l2_data["basic_info"])
             
             self.progress.mark_step_status(ProcessStep.MAP_ENTITY_NETWORK, Status.COMPLETED)
@@ -338,8 +511,7 @@ class TrainProcessService:
     def decode_preference_patterns(self)->bool:
         """Decode preference patterns using notes and related data"""
         try:
-            params_manager = TrainingParamsManager()
-            training_params = params_manager.get_latest_training_params()
+            training_params = self._get_training_params()
             concurrency_threads = training_params.get("concurrency_threads")
             data_synthesis_mode = training_params.get("data_synthesis_mode")
             os.environ["CONCURRENCY_THREADS"] = str(concurrency_threads)
@@ -352,8 +524,7 @@ class TrainProcessService:
             self._prepare_l2_data()
 
             # Use data from l2_data dictionary
-            training_params = TrainingParamsManager.get_latest_training_params()
-            L2Generator(is_cot=training_params.get("is_cot", False)).gen_preference_data(                
+            self._get_l2_generator(is_cot=training_params.get("is_cot", False)).gen_preference_data(                
                     self.l2_data["notes"],
                     self.l2_data["basic_info"],
                     self.l2_data["data_output_base_dir"],
@@ -382,11 +553,9 @@ class TrainProcessService:
             self._prepare_l2_data()
 
             # Get training parameters
-            training_params = TrainingParamsManager.get_latest_training_params()
+            training_params = self._get_training_params()
             # Use data from l2_data dictionary
-            l2_generator = L2Generator(
-                data_path=os.path.join(os.getcwd(), "resources"), is_cot=training_params.get("is_cot", False)
-                )  
+            l2_generator = self._get_l2_generator(is_cot=training_params.get("is_cot", False))
             l2_generator.gen_selfqa_data(
                     self.l2_data["notes"],
                     self.l2_data["basic_info"],
@@ -410,19 +579,24 @@ class TrainProcessService:
         """Clean up resources to prevent memory leaks"""
         logger.info("Cleaning up resources to prevent memory leaks")
         
+        # A full collection walks the whole heap, so only run it when large L2 data was actually released
+        released_data = any(value is not None for value in self.l2_data.values())
+
         # Clean up large data structures in l2_data dictionary
         for key in self.l2_data:
             self.l2_data[key] = None
         
         self.l2_data_prepared = False
+        self._l2_generators.clear()
         
-        # Force garbage collection
-        gc.collect()
+        if released_data:
+            gc.collect()
         
         # Log memory usage after cleanup
-        process = psutil.Process(os.getpid())
-        memory_info = process.memory_info()
-        logger.info(f"Memory usage after cleanup: {memory_info.rss / 1024 / 1024:.2f} MB")
+        if logger.isEnabledFor(logging.DEBUG):
+            process = psutil.Process(os.getpid())
+            memory_info = process.memory_info()
+            logger.debug(f"Memory usage after cleanup: {memory_info.rss / 1024 / 1024:.2f} MB")
     
     def augment_content_retention(self) -> bool:
         """Augment content retention using notes, basic info and graph data"""
@@ -434,9 +608,9 @@ class TrainProcessService:
             self._prepare_l2_data()
 
             # Get training parameters
-            training_params = TrainingParamsManager.get_latest_training_params()
+            training_params = self._get_training_params()
             # Use data from l2_data dictionary
-            l2_generator = L2Generator(data_path=os.path.join(os.getcwd(), "resources"), is_cot=training_params.get("is_cot", False))
+            l2_generator = self._get_l2_generator(is_cot=training_params.get("is_cot", False))
             l2_generator.gen_diversity_data(
                 self.l2_data["notes"],
                 self.l2_data["basic_info"],
@@ -486,7 +660,7 @@ class TrainProcessService:
         # Setup directories and paths
         config = Config.from_env()
         base_dir = os.path.join(
-            os.getcwd(), config.get("USER_DATA_PIPELINE_DIR") + "/raw_data"
+            self._base_dir, config.get("USER_DATA_PIPELINE_DIR") + "/raw_data"
         )
         os.makedirs(base_dir, exist_ok=True)
 
@@ -498,50 +672,105 @@ class TrainProcessService:
         topics_data = chunk_service.query_topics_data()
         save_true_topics(topics_data, topics_path)
 
+        # Notes and user information only change with the documents and L1 data, so reuse
+        # what a previous run or attempt derived from the same data
+        cache_path = os.path.join(self._l2_cache_dir, f"{self._l2_data_cache_key()}.pkl")
+        cached_data = None
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    cached_data = pickle.load(f)
+                logger.info(f"Loaded notes and user information from {cache_path}")
+            except Exception as e:
+                logger.warning(f"Failed to load L2 data cache {cache_path}: {str(e)}")
+
         # Initialize storage
         storage = NotesStorage()
-        logger.info("Notes not found, preparing them...")
-        documents = document_service.list_documents_with_l0()
-        logger.info(f"list_documents_with_l0 len: {len(documents)}")
-        notes_list, _ = extract_notes_from_documents(documents)
-        logger.info(f"extract_notes_from_documents len: {len(notes_list)}")
-        note_service = NoteService()
-        note_service.prepareNotes(notes_list)
-        storage.save_notes(notes_list)
-        self.l2_data["notes"] = storage.load_notes()
+        if cached_data:
+            # Later L2 steps read notes.json, so write it again from the cached notes
+            storage.save_notes(cached_data["notes"])
+            self.l2_data["notes"] = cached_data["notes"]
+        else:
+            logger.info("Notes not found, preparing them...")
+            documents = document_service.list_documents_with_l0()
+            logger.info(f"list_documents_with_l0 len: {len(documents)}")
+            notes_list, _ = extract_notes_from_documents(documents)
+            logger.info(f"extract_notes_from_documents len: {len(notes_list)}")
+            note_service = NoteService()
+            note_service.prepareNotes(notes_list)
+            storage.save_notes(notes_list)
+            self.l2_data["notes"] = storage.load_notes()
 
         # Get paths
         self.l2_data["config_path"] = os.path.join(
-            os.getcwd(),
-            "resources/L2/data_pipeline/data_prep/subjective/config/config.json",
+            self._resources_dir,
+            "L2/data_pipeline/data_prep/subjective/config/config.json",
         )
         self.l2_data["entitys_path"] = os.path.join(
-            os.getcwd(),
-            "resources/L2/data_pipeline/raw_data/id_entity_mapping_subjective_v2.json",
+            self._resources_dir,
+            "L2/data_pipeline/raw_data/id_entity_mapping_subjective_v2.json",
         )
         self.l2_data["graph_path"] = os.path.join(
-            os.getcwd(),
-            "resources/L1/graphrag_indexing_output/subjective/entities.parquet",
+            self._resources_dir,
+            "L1/graphrag_indexing_output/subjective/entities.parquet",
         )
-        self.l2_data["data_output_base_dir"] = os.path.join(os.getcwd(), "resources/L2/data")
-
-        # Lazy load user information
-        logger.info("Loading user information...")
-        status_bio = get_latest_status_bio()
-        global_bio = get_latest_global_bio()
-        self.l2_data["basic_info"] = {
-            "username": LoadService.get_current_upload_name(),
-            "aboutMe": LoadService.get_current_upload_description(),
-            "statusBio": status_bio.content if status_bio else "Currently working on an AI project.",
-            "globalBio": global_bio.content_third_view if global_bio
-                else "The User is a software engineer who loves programming and learning new technologies.",
-            "lang": "English",
-        }
+        self.l2_data["data_output_base_dir"] = os.path.join(self._resources_dir, "L2/data")
+
+        if cached_data:
+            self.l2_data["basic_info"] = cached_data["basic_info"]
+        else:
+            # Lazy load user information
+            logger.info("Loading user information...")
+            status_bio = get_latest_status_bio()
+            global_bio = get_latest_global_bio()
+            self.l2_data["basic_info"] = {
+                "username": LoadService.get_current_upload_name(),
+                "aboutMe": LoadService.get_current_upload_description(),
+                "statusBio": status_bio.content if status_bio else "Currently working on an AI project.",
+                "globalBio": global_bio.content_third_view if global_bio
+                    else "The User is a software engineer who loves programming and learning new technologies.",
+                "lang": "English",
+            }
+
+            try:
+                os.makedirs(self._l2_cache_dir, exist_ok=True)
+                # Entries for earlier data can never be hit again, so only the current one is kept
+                for entry in os.scandir(self._l2_cache_dir):
+                    if entry.name.endswith(".pkl") and entry.path != cache_path:
+                        os.remove(entry.path)
+                with open(cache_path, "wb") as f:
+                    pickle.dump(
+                        {"notes": self.l2_data["notes"], "basic_info": self.l2_data["basic_info"]},
+                        f,
+                        protocol=pickle.HIGHEST_PROTOCOL,
+                    )
+            except Exception as e:
+                logger.warning(f"Failed to write L2 data cache {cache_path}: {str(e)}")
 
         # Mark data as prepared
         self.l2_data_prepared = True
 
-        return self.l2_data   
+        return self.l2_data
+
+    def _l2_data_cache_key(self) -> str:
+        """Build the L2 data cache key from the state of the data the notes are derived from
+
+        Returns:
+            str: Short hash of the document count, latest document update, L1 version,
+                latest status biography and current upload
+        """
+        with DatabaseSession.session() as session:
+            document_count, latest_document_update = session.query(
+                func.count(DocumentModel.id), func.max(DocumentModel.update_time)
+            ).one()
+            latest_l1_version = session.query(func.max(L1Version.version)).scalar()
+            latest_status_bio = session.query(func.max(StatusBiography.create_time)).scalar()
+        key_source = (
+            f"{document_count}:{latest_document_update}:{latest_l1_version}:{latest_status_bio}:"
+            f"{LoadService.get_current_upload_name()}:{LoadService.get_current_upload_description()}"
+        )
+        return hashlib.sha256(key_source.encode()).hexdigest()[:16]
+
     def train(self) -> bool:
         """Start model training"""
         try:
@@ -563,7 +792,7 @@ class TrainProcessService:
                     return False
             
             # Prepare log directory and file
-            log_dir = os.path.join(os.getcwd(), "logs")
+            log_dir = os.path.join(self._base_dir, "logs")
             os.makedirs(log_dir, exist_ok=True)
             log_path = os.path.join(log_dir, "train", "train.log")
             logger.info(f"Log file path: {log_path}")
@@ -575,7 +804,7 @@ class TrainProcessService:
             os.environ["USER_NAME"] = LoadService.get_current_upload_name()
             logger.info(f"USER_NAME environment variable set: {os.environ['USER_NAME']}")
             
-            script_path = os.path.join(os.getcwd(), "lpm_kernel/L2/train_for_user.sh")
+            script_path = os.path.join(self._base_dir, "lpm_kernel/L2/train_for_user.sh")
             
             # First start monitoring progress in a separate thread
             logger.info("Starting monitoring thread first...")
@@ -630,7 +859,7 @@ class TrainProcessService:
             - merged_dir: Merged model output directory
             - gguf_dir: GGUF model output directory
         """
-        base_dir = os.getcwd()
+        base_dir = self._base_dir
         paths = {
             "base_path": os.path.join(base_dir, "resources/L2/base_models", model_name),
             "personal_dir": os.path.join(base_dir, "resources/model/output/personal_model", model_name),
@@ -672,8 +901,7 @@ class TrainProcessService:
             self.is_stopped = False
             
             # Get the latest training parameters from the class
-            params_manager = TrainingParamsManager()
-            training_params = params_manager.get_latest_training_params()
+            training_params = self._get_training_params()
             learning_rate = training_params.get("learning_rate")
             num_train_epochs = training_params.get("number_of_epochs")
             concurrency_threads = training_params.get("concurrency_threads")
@@ -834,8 +1062,12 @@ class TrainProcessService:
             total_size = 0  # Total size of all files
             file_sizes = {}  # Dictionary to store file sizes
             last_update_time = time.time()
+            download_done = self._download_done
             
-            while True:
+            finished = False
+            while not finished:
+                # Once the download has returned, read the remaining log lines one last time and stop
+                finished = download_done.is_set()
                 try:
                     # Read new log content
                     with open(log_file, 'r') as f:
@@ -901,13 +1133,15 @@ class TrainProcessService:
                             logger.info("Model download completed")
                             return True
                     
-                    # Briefly pause to avoid excessive CPU usage
-                    time.sleep(0.1)
                     
                 except IOError as e:
                     logger.error(f"Failed to read log file: {str(e)}")
-                    time.sleep(0.1)
-                    continue
+
+                # Wait for new log lines, waking up immediately when the download finishes
+                if not finished:
+                    download_done.wait(0.5)
+
+            return False
                     
         except Exception as e:
             logger.error(f"Failed to monitor model download progress: {str(e)}")
@@ -938,9 +1172,9 @@ class TrainProcessService:
             os.makedirs(paths["merged_dir"], exist_ok=True)
                 
             script_path = os.path.join(
-                os.getcwd(), "lpm_kernel/L2/merge_weights_for_user.sh"
+                self._base_dir, "lpm_kernel/L2/merge_weights_for_user.sh"
                 )
-            log_path = os.path.join(os.getcwd(), "logs", f"merge_weights_{self.model_name}.log")
+            log_path = os.path.join(self._base_dir, "logs", f"merge_weights_{self.model_name}.log")
             
             # Ensure log directory exists
             os.makedirs(os.path.dirname(log_path), exist_ok=True)
@@ -1002,13 +1236,12 @@ class TrainProcessService:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             gguf_filename = f"{timestamp}.gguf"
             
-            script_path = os.path.join(os.getcwd(), "lpm_kernel/L2/convert_hf_to_gguf.py")
+            script_path = os.path.join(self._base_dir, "lpm_kernel/L2/convert_hf_to_gguf.py")
             gguf_path = os.path.join(gguf_dir, gguf_filename)
             logger.info(f"GGUF output path: {gguf_path}")
 
             # Get training parameters from TrainingParamsManager
-            from ..trainprocess.training_params_manager import TrainingParamsManager
-            training_params = TrainingParamsManager.get_latest_training_params()
+            training_params = self._get_training_params()
             logger.info(f"Retrieved training parameters: {training_params}")
             
             # Save training parameters to a JSON file in the GGUF directory
@@ -1111,49 +1344,76 @@ class TrainProcessService:
                     self.progress.mark_step_status(step, Status.FAILED)
             return False
 
-    def start_process(self) -> bool:
-        """Start training process"""
+    def start_process(self, force: bool = False) -> bool:
+        """Start training process
+
+        Args:
+            force: Run every step from the beginning, even those already completed by a previous run
+
+        Returns:
+            bool: True if all steps ran successfully or the process was stopped, False otherwise
+        """
+        # Steps submitted to the executor and not yet collected, so a failure can be attributed to them
+        running = {}
         try:
             self.is_stopped = False
+            self._clear_documents_cache()
+            self._training_params_cache = None
             # Store the current process PID
             self.current_pid = os.getpid()  # Store the PID
             logger.info(f"Training process started with PID: {self.current_pid}")
-            # Get the ordered list of all steps
+            # Get the ordered list of all steps and what each of them depends on
             ordered_steps = ProcessStep.get_ordered_steps()
+            dependencies = ProcessStep.get_step_dependencies()
 
-            # Get the last successfully completed step
-            last_successful_step = self.progress.get_last_successful_step()
-            start_index = 0
-            if last_successful_step:
-                start_index = ordered_steps.index(last_successful_step) + 1
-
-            # Start executing from the step after the last successful one
-            for step in ordered_steps[start_index:]:
-                self.current_step = step
-                if self.is_stopped:
-                    logger.info("Training process aborted during step")
-                    self.progress.mark_step_status(step, Status.SUSPENDED)
-                    break  # If stop is requested, exit the loop
-            
-                logger.info(f"Starting step: {step.value}")
-
-                # Execute the corresponding method
-                method_name = step.get_method_name()
-                if not hasattr(self, method_name):
-                    logger.error(f"Method {method_name} not found")
-                    self.progress.mark_step_status(step, Status.FAILED)
-                    return False
+            # Steps may complete out of order, so each one is checked on its own: a failed model
+            # download has to run again even when later steps completed
+            done = set()
+            pending = []
+            for step in ordered_steps:
+                if not force and self.progress.is_step_completed(step):
+                    logger.info(f"Skipping completed step: {step.value}")
+                    done.add(step)
+                else:
+                    pending.append(step)
 
-                method = getattr(self, method_name)
-                success = method()
+            # Run every step as soon as the steps it depends on have completed, so
+            # independent steps (e.g. the model download) overlap with the others
+            failed = False
+            # Step transitions are frequent; only terminal states need to reach the progress file at once
+            with self.progress.batch_mode(), ThreadPoolExecutor(max_workers=3) as executor:
+                while pending or running:
+                    ready = [step for step in pending if all(dep in done for dep in dependencies[step])]
+                    if self.is_stopped:
+                        # Let running steps wind down, then suspend the next step that would have started
+                        if not running:
+                            logger.info("Training process aborted during step")
+                            if ready:
+                                self.progress.mark_step_status(ready[0], Status.SUSPENDED)
+                            break
+                    else:
+                        for step in ready:
+                            pending.remove(step)
+                            self.current_step = step
+                            running[executor.submit(self._run_step, step)] = step
 
-                if not success:
-                    logger.error(f"Step {step.value} failed")
-                    logger.info(f'Marking step as failed: stage={step.value}, step={step.value}')
-                    self.progress.mark_step_status(step, Status.FAILED)
-                    return False
-                logger.info(f"Step {step.value} completed successfully")
-                # self.progress.mark_step_status(step, Status.COMPLETED)
+                    if not running:
+                        break
+
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        step = running.pop(future)
+                        if future.result():
+                            done.add(step)
+                        elif not self.is_stopped:
+                            failed = True
+
+                    if failed:
+                        # Start nothing new; steps already running cannot be interrupted
+                        pending = []
+
+            if failed:
+                return False
             if self.is_stopped:
                 logger.info("Training process was stopped during a step")
             else:
@@ -1162,9 +1422,47 @@ class TrainProcessService:
             return True
         except Exception as e:
             logger.error(f"Exception occurred: {str(e)}", exc_info=True)
-            if self.current_step:
-                self.progress.mark_step_status(self.current_step, Status.FAILED)
+            # Mark every step that was running and did not succeed, not just the last one started
+            for future, step in running.items():
+                if not (future.done() and future.exception() is None and future.result()):
+                    self.progress.mark_step_status(step, Status.FAILED)
+            return False
+
+    def _run_step(self, step: ProcessStep) -> bool:
+        """Run a single training step
+
+        Args:
+            step: The process step to run
+
+        Returns:
+            bool: True if the step succeeded, False otherwise
+        """
+        logger.info(f"Starting step: {step.value}")
+
+        # Execute the corresponding method
+        method_name = step.get_method_name()
+        if not hasattr(self, method_name):
+            logger.error(f"Method {method_name} not found")
+            self.progress.mark_step_status(step, Status.FAILED)
+            return False
+
+        try:
+            success = getattr(self, method_name)()
+        except Exception as e:
+            logger.error(f"Exception occurred in step {step.value}: {str(e)}", exc_info=True)
+            success = False
+
+        if not success and self.is_stopped:
+            # The step gave up because a stop was requested; it has already marked itself suspended
+            logger.info(f"Step {step.value} stopped")
+            return False
+        if not success:
+            logger.error(f"Step {step.value} failed")
+            logger.info(f'Marking step as failed: stage={step.value}, step={step.value}')
+            self.progress.mark_step_status(step, Status.FAILED)
             return False
+        logger.info(f"Step {step.value} completed successfully")
+        return True
 
     def reset_progress(self):
         """Save current progress
@@ -1173,6 +1471,8 @@ class TrainProcessService:
         """
         try:
             self.progress.reset_progress()
+            self._training_params_cache = None
+            shutil.rmtree(self._l2_cache_dir, ignore_errors=True)
             logger.info("Progress saved successfully")
         except Exception as e:
             logger.error(f"Failed to save progress: {str(e)}", exc_info=True)
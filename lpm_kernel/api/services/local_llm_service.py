@@ -1,44 +1,280 @@
 import os
+import functools
 import json
 import logging
 import psutil
+import re
+import requests
+import select
+import signal
+import socket
 import time
+import shutil
 import subprocess
-import torch  # Add torch import for CUDA detection
+import tempfile
 import threading
 import queue
-from typing import Iterator, Any, Optional, Generator, Dict
+from typing import Iterator, Any, Optional, Generator, Dict, List, Tuple
+from dataclasses import replace
 from datetime import datetime
 from flask import Response
+import httpx
 from openai import OpenAI
+from lpm_kernel.api.common.errors import APIError, ErrorCodes
 from lpm_kernel.api.domains.kernel2.dto.server_dto import ServerStatus, ProcessInfo
 from lpm_kernel.configs.config import Config
+from lpm_kernel.configs.logging import LOG_BASE_DIR
 import uuid
+import weakref
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# PID of the llama-server started by this service, so status checks don't scan every process
+LLAMA_SERVER_PID_FILE = os.path.join(tempfile.gettempdir(), "llama-server.pid")
+LLAMA_SERVER_LOG_FILE = os.path.join(LOG_BASE_DIR, "llama-server.log")
+LLAMA_SERVER_HEALTH_URL = "http://127.0.0.1:8080/health"
+LLAMA_SERVER_COMPLETION_URL = "http://127.0.0.1:8080/completion"
+# Readiness polling of a freshly started llama-server (seconds)
+LLAMA_SERVER_READY_TIMEOUT = 30
+LLAMA_SERVER_READY_INTERVAL = 0.5
+# Seconds a full server status lookup is reused for
+STATUS_CACHE_TTL = 0.5
+# Present when the NVIDIA driver has a GPU, on Linux and under WSL respectively
+NVIDIA_DEVICE_PATHS = ("/dev/nvidia0", "/proc/driver/nvidia/gpus", "/usr/lib/wsl/lib/libnvidia-ml.so.1")
+# On CPU the model is only locked in RAM when this multiple of its size is available
+MLOCK_MEMORY_HEADROOM = 1.5
+
+# Queued stream events are coalesced into writes of up to about this many bytes
+STREAM_BATCH_BYTES = 1024
+# End-of-stream event
+SSE_DONE = b"data: [DONE]\n\n"
+
+# Marks an attribute missing from a response chunk, as opposed to one set to None
+_MISSING = object()
+
+# Streamed chunk with the fields that vary per chunk left as JSON-encoded placeholders:
+# id, created, system_fingerprint, delta content and finish_reason
+CHUNK_TEMPLATE = (
+    b'{"id":%s,"object":"chat.completion.chunk","created":%d,"model":"models/lpm",'
+    b'"system_fingerprint":%s,"choices":[{"index":0,"delta":{"content":%s},"finish_reason":%s}]}'
+)
+# Forwarded llama-server events report the same model name as chunks built from CHUNK_TEMPLATE
+_MODEL_FIELD_PATTERN = re.compile(rb'"model":\s*"(?:[^"\\]|\\.)*"')
+LPM_MODEL_FIELD = b'"model":"models/lpm"'
+
+def _is_server_cmdline(cmdline: List[str]) -> bool:
+    """Check whether a process command line belongs to llama-server, with a single substring search"""
+    return "llama-server" in " ".join(cmdline)
+
+def _log_terminated(proc: psutil.Process):
+    """psutil.wait_procs callback, called as each killed llama-server process exits"""
+    logger.info(f"Successfully terminated llama-server process {proc.pid}")
+
+def _json_bytes(value: Any) -> bytes:
+    """JSON-encode a single value to bytes, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value).encode('utf-8')
+
+def _sse_data(payload: Dict[str, Any]) -> bytes:
+    """Encode a payload as an SSE data event, using orjson when installed"""
+    return b"data: " + _json_bytes(payload) + b"\n\n"
+
+# Library directories added to LD_LIBRARY_PATH for a GPU llama-server
+CUDA_LIB_PATHS = (
+    "/usr/local/cuda/lib64",
+    "/usr/lib/cuda/lib64",
+    "/usr/local/lib",
+    "/usr/lib/x86_64-linux-gnu",
+    "/usr/lib/wsl/lib",  # For Windows WSL environments
+)
+# Candidate CUDA runtime locations on Linux; the first one found is put first and becomes CUDA_HOME
+CUDA_RUNTIME_PATHS = (
+    "/usr/local/cuda/lib64",
+    "/usr/lib/cuda/lib64",
+    "/usr/local/lib/python3.12/site-packages/nvidia/cuda_runtime/lib",
+    "/usr/local/lib/python3.10/site-packages/nvidia/cuda_runtime/lib",
+)
+
+@functools.lru_cache(maxsize=4)
+def _build_cuda_env(ld_library_path: str) -> Dict[str, str]:
+    """Build the CUDA library environment for llama-server on top of the given LD_LIBRARY_PATH
+    
+    The library directories don't change while the app runs, so each is checked only once.
+    
+    Args:
+        ld_library_path: LD_LIBRARY_PATH of the current environment
+        
+    Returns:
+        Dict with LD_LIBRARY_PATH and, when a CUDA runtime is found on Linux, CUDA_HOME
+    """
+    entries = [path for path in ld_library_path.split(":") if path]
+    known = set(entries)
+    for path in CUDA_LIB_PATHS:
+        if path not in known and os.path.exists(path):
+            entries.insert(0, path)
+            known.add(path)
+
+    cuda_env = {}
+    if os.name != 'nt':
+        cuda_path = next((path for path in CUDA_RUNTIME_PATHS if os.path.exists(path)), None)
+        if cuda_path is not None:
+            # Give the CUDA runtime precedence over the other library directories
+            if cuda_path in known:
+                entries.remove(cuda_path)
+            entries.insert(0, cuda_path)
+            cuda_env["CUDA_HOME"] = os.path.dirname(cuda_path)
+
+    cuda_env["LD_LIBRARY_PATH"] = ":".join(entries)
+    return cuda_env
+
+class _SlotReleasingStream:
+    """Wraps a response stream so its inference slot is released once the stream ends or is closed"""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._iterator = None
+        # Runs at most once: on close, or when a consumer drops the stream without closing it
+        self._release = weakref.finalize(self, release)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        # Iterator rather than generator, so isinstance(..., Iterator) checks keep matching the stream
+        if self._iterator is None:
+            self._iterator = iter(self._stream)
+        try:
+            return next(self._iterator)
+        except BaseException:
+            # Includes StopIteration at the end of the stream
+            self.close()
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def close(self):
+        self._release()
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            close()
+
 class LocalLLMService:
     """Service for managing local LLM client and server"""
     
     def __init__(self):
         self._client = None
         self._stopping_server = False
+        # GPU presence doesn't change while the process runs, so it is detected only once
+        self._gpu_available: Optional[bool] = None
+        self._process: Optional[subprocess.Popen] = None
+        # Path to the llama-server executable, with .exe on Windows
+        self._server_path = os.path.join(
+            os.getcwd(), "llama.cpp", "build", "bin",
+            "llama-server.exe" if os.name == 'nt' else "llama-server"
+        )
+        # (monotonic time, status) of the last full status lookup
+        self._status_cache: Tuple[float, Optional[ServerStatus]] = (0.0, None)
+        # Number of requests llama-server decodes at once (its --parallel slots);
+        # further requests queue here instead of piling up on the server
+        self._max_parallel = max(1, int(Config.from_env().get("LLAMA_MAX_PARALLEL", 2)))
+        self._inflight = threading.BoundedSemaphore(self._max_parallel)
+        self._ctx_per_slot = max(512, int(Config.from_env().get("LLAMA_CTX_PER_SLOT", 2048)))
+        # Seconds a request waits for a free slot before it is turned away
+        self._slot_wait_timeout = float(Config.from_env().get("LLAMA_SLOT_WAIT_TIMEOUT", 120))
+        self._pending_lock = threading.Lock()
+        self._pending_requests = 0
         
     @property
     def client(self) -> OpenAI:
-        config = Config.from_env()
         """Get the OpenAI client for local LLM server"""
         if self._client is None:
+            config = Config.from_env()
             base_url = config.get("LOCAL_LLM_SERVICE_URL")
             if not base_url:
                 raise ValueError("LOCAL_LLM_SERVICE_URL environment variable is not set")
                 
+            # Keep connections to llama-server alive between requests; reads have no short
+            # timeout since a stream may pause while the server works through a long prompt
+            http_client = httpx.Client(
+                timeout=httpx.Timeout(connect=2.0, read=600.0, write=10.0, pool=5.0),
+                transport=httpx.HTTPTransport(
+                    limits=httpx.Limits(
+                        max_keepalive_connections=32, max_connections=64, keepalive_expiry=60.0
+                    ),
+                    retries=0,
+                    # Send small requests right away instead of waiting on Nagle's algorithm
+                    socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)],
+                ),
+            )
             self._client = OpenAI(
                 base_url=base_url,
-                api_key="sk-no-key-required"
+                api_key="sk-no-key-required",
+                http_client=http_client
             )
         return self._client
 
+    def _detect_gpu_availability(self) -> bool:
+        """Check whether a CUDA GPU is available, caching the result for later calls"""
+        if self._gpu_available is None:
+            self._gpu_available = self._probe_nvidia_gpu()
+        return self._gpu_available
+
+    def _probe_nvidia_gpu(self) -> bool:
+        """Check for an NVIDIA GPU without loading torch
+        
+        The driver's device files are checked first; `nvidia-smi -L` is only run when none of
+        them exist, e.g. on Windows.
+        """
+        if any(os.path.exists(path) for path in NVIDIA_DEVICE_PATHS):
+            return True
+
+        nvidia_smi = shutil.which("nvidia-smi")
+        if not nvidia_smi:
+            return False
+        try:
+            result = subprocess.run(
+                [nvidia_smi, "-L"], capture_output=True, text=True, timeout=2
+            )
+        except subprocess.TimeoutExpired:
+            logger.warning("nvidia-smi did not respond within 2 seconds")
+            return False
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Failed to run nvidia-smi: {e}")
+            return False
+        return result.returncode == 0 and "GPU" in result.stdout
+
+    def _query_gpu_info(self) -> Optional[Dict[str, str]]:
+        """Get name, total memory and compute capability of the first GPU from nvidia-smi
+        
+        Returns:
+            Dict with name, memory_total (MiB) and compute_cap, or None if the query fails
+        """
+        nvidia_smi = shutil.which("nvidia-smi")
+        if not nvidia_smi:
+            return None
+        try:
+            result = subprocess.run(
+                [nvidia_smi, "--query-gpu=name,memory.total,compute_cap", "--format=csv,noheader,nounits"],
+                capture_output=True, text=True, timeout=2
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Failed to query GPU info: {e}")
+            return None
+        lines = result.stdout.strip().splitlines()
+        if result.returncode != 0 or not lines:
+            return None
+        fields = [field.strip() for field in lines[0].split(",")]
+        if len(fields) != 3:
+            return None
+        return dict(zip(("name", "memory_total", "compute_cap"), fields))
+
     def start_server(self, model_path: str, use_gpu: bool = True) -> bool:
         """
         Start the llama-server service with GPU acceleration when available
@@ -57,50 +293,36 @@ class LocalLLMService:
                 logger.info("LLama server is already running")
                 return True
 
-            # Check for CUDA availability if GPU was requested
-            cuda_available = torch.cuda.is_available() if use_gpu else False
+            # llama-server runs on the CPU for now (CUDA_VISIBLE_DEVICES is cleared below), so the
+            # GPU is not probed; use self._detect_gpu_availability() once GPU inference is enabled
             cuda_available = False
             gpu_info = ""
             
             if use_gpu and cuda_available:
-                gpu_device = torch.cuda.current_device()
-                gpu_info = f" using GPU: {torch.cuda.get_device_name(gpu_device)}"
-                gpu_memory = torch.cuda.get_device_properties(gpu_device).total_memory / (1024**3)
-                
-                logger.info(f"CUDA is available. Using GPU acceleration{gpu_info}")
-                logger.info(f"CUDA device capabilities: {torch.cuda.get_device_capability(gpu_device)}")
-                logger.info(f"CUDA memory: {gpu_memory:.2f} GB")
-                
-                # Pre-initialize CUDA to speed up first inference
-                logger.info("Pre-initializing CUDA context to speed up first inference")
-                torch.cuda.init()
-                torch.cuda.empty_cache()
+                # llama-server initializes CUDA in its own process, so no CUDA context is created here
+                device = self._query_gpu_info()
+                if device:
+                    gpu_info = f" using GPU: {device['name']}"
+                    logger.info(f"CUDA is available. Using GPU acceleration{gpu_info}")
+                    logger.info(f"CUDA device capabilities: {device['compute_cap']}")
+                    logger.info(f"CUDA memory: {device['memory_total']} MiB")
+                else:
+                    logger.info("CUDA is available. Using GPU acceleration")
             elif use_gpu and not cuda_available:
                 logger.warning("CUDA was requested but is not available. Using CPU instead.")
             else:
                 logger.info("Using CPU for inference (GPU not requested)")
 
-            # Check for GPU optimization marker
-            gpu_optimized = False
-            model_dir = os.path.dirname(model_path)
-            gpu_marker_path = os.path.join(model_dir, "gpu_optimized.json")
-            if os.path.exists(gpu_marker_path):
-                try:
-                    with open(gpu_marker_path, 'r') as f:
-                        gpu_data = json.load(f)
-                        if gpu_data.get("gpu_optimized", False):
-                            gpu_optimized = True
-                            logger.info(f"Found GPU optimization marker created on {gpu_data.get('optimized_on', 'unknown date')}")
-                except Exception as e:
-                    logger.warning(f"Error reading GPU marker file: {e}")
-
-            # Get the correct path to the llama-server executable
-            base_dir = os.getcwd()
-            server_path = os.path.join(base_dir, "llama.cpp", "build", "bin", "llama-server")
-            
-            # For Windows, add .exe extension if needed
-            if os.name == 'nt' and not server_path.endswith('.exe'):
-                server_path += '.exe'
+            # Check for GPU optimization marker; it is only ever written with gpu_optimized set,
+            # so its presence is enough and its modification time tells when it was created
+            gpu_marker_path = os.path.join(os.path.dirname(model_path), "gpu_optimized.json")
+            try:
+                optimized_on = datetime.fromtimestamp(os.path.getmtime(gpu_marker_path)).isoformat()
+                logger.info(f"Found GPU optimization marker created on {optimized_on}")
+            except OSError:
+                pass
+
+            server_path = self._server_path
                 
             # Verify executable exists
             if not os.path.exists(server_path):
@@ -113,9 +335,12 @@ class LocalLLMService:
                 "-m", model_path,
                 "--host", "0.0.0.0",
                 "--port", "8080",
-                "--ctx-size", "2048",     # Default context size (adjust based on needs)
-                "--parallel", "2",        # Enable request parallelism
-                "--cont-batching"         # Enable continuous batching
+                # The context is split evenly between the parallel slots, so size it per slot
+                "--ctx-size", str(self._ctx_per_slot * self._max_parallel),
+                "--parallel", str(self._max_parallel),  # Enable request parallelism
+                "--cont-batching",        # Enable continuous batching
+                "--cache-reuse", "256",   # Reuse cached KV of a shared prompt prefix (e.g. the system prompt) across turns
+                "--cache-type-k", "q8_0", # Halve K cache memory; the V cache can only be quantized with flash attention
             ]
             
             # Set up environment with CUDA variables to ensure GPU detection
@@ -135,82 +360,65 @@ class LocalLLMService:
                 # Set CUDA environment variables to help with GPU detection
                 env["CUDA_VISIBLE_DEVICES"] = "0"  # Force using first GPU
                 
-                # Ensure comprehensive library paths for CUDA
-                cuda_lib_paths = [
-                    "/usr/local/cuda/lib64",
-                    "/usr/lib/cuda/lib64",
-                    "/usr/local/lib",
-                    "/usr/lib/x86_64-linux-gnu",
-                    "/usr/lib/wsl/lib"  # For Windows WSL environments
-                ]
-                
-                # Build a comprehensive LD_LIBRARY_PATH
-                current_ld_path = env.get("LD_LIBRARY_PATH", "")
-                for path in cuda_lib_paths:
-                    if os.path.exists(path) and path not in current_ld_path:
-                        current_ld_path = f"{path}:{current_ld_path}" if current_ld_path else path
-                
-                env["LD_LIBRARY_PATH"] = current_ld_path
-                logger.info(f"Setting LD_LIBRARY_PATH to: {current_ld_path}")
-                
                 # If this is Windows, use different approach for CUDA libraries
                 if os.name == 'nt':
                     # Windows typically has CUDA in PATH already if installed
                     logger.info("Windows system detected, using system CUDA libraries")
-                else:
-                    # On Linux, try to find CUDA libraries in common locations
-                    for cuda_path in [
-                        # Common CUDA paths
-                        "/usr/local/cuda/lib64",
-                        "/usr/lib/cuda/lib64",
-                        "/usr/local/lib/python3.12/site-packages/nvidia/cuda_runtime/lib",
-                        "/usr/local/lib/python3.10/site-packages/nvidia/cuda_runtime/lib",
-                    ]:
-                        if os.path.exists(cuda_path):
-                            # Add CUDA path to library path
-                            env["LD_LIBRARY_PATH"] = f"{cuda_path}:{env.get('LD_LIBRARY_PATH', '')}"
-                            env["CUDA_HOME"] = os.path.dirname(cuda_path)
-                            logger.info(f"Found CUDA at {cuda_path}, setting environment variables")
-                            break
+                cuda_env = _build_cuda_env(env.get("LD_LIBRARY_PATH", ""))
+                env.update(cuda_env)
+                logger.info(f"Setting LD_LIBRARY_PATH to: {env['LD_LIBRARY_PATH']}")
+                if "CUDA_HOME" in cuda_env:
+                    logger.info(f"Found CUDA at {cuda_env['CUDA_HOME']}, setting environment variables")
 
                 # NOTE: CUDA support and rebuild should be handled at build/setup time (e.g., Docker build or setup script).
                 # The runtime check and rebuild logic has been removed for efficiency and reliability.
                 # Ensure llama.cpp is built with CUDA support before running the server if GPU is required.
 
-                # Pre-heat GPU to ensure faster initial response
-                if torch.cuda.is_available():
-                    logger.info("Pre-warming GPU to reduce initial latency...")
-                    dummy_tensor = torch.zeros(1, 1).cuda()
-                    del dummy_tensor
-                    torch.cuda.synchronize()
-                    torch.cuda.empty_cache()
-                    logger.info("GPU warm-up complete")
-                
                 logger.info("Using GPU acceleration for inference with optimized settings")
             else:
                 # If GPU isn't available or supported, optimize for CPU
                 cmd.extend([
                     "--threads", str(max(1, os.cpu_count() - 1)),  # Use all CPU cores except one
                 ])
+                # Lock the model in memory to prevent swapping, but only when it comfortably fits
+                try:
+                    model_size = os.path.getsize(model_path)
+                    if psutil.virtual_memory().available > model_size * MLOCK_MEMORY_HEADROOM:
+                        cmd.append("--mlock")
+                except OSError as e:
+                    logger.warning(f"Could not determine model size for --mlock: {e}")
                 logger.info(f"Using CPU-only mode with {max(1, os.cpu_count() - 1)} threads")
             
             logger.info(f"Starting llama-server with command: {' '.join(cmd)}")
             
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-                env=env
-            )
-            
-            # Wait for server to start (longer wait for GPU initialization)
-            wait_time = 5 if cuda_available and use_gpu else 3
-            logger.info(f"Waiting {wait_time} seconds for server to start...")
-            time.sleep(wait_time)
+            # Server output goes to a log file; an undrained pipe would block the server once full
+            os.makedirs(os.path.dirname(LLAMA_SERVER_LOG_FILE), exist_ok=True)
+            with open(LLAMA_SERVER_LOG_FILE, "ab") as log_file:
+                log_offset = log_file.tell()
+                process = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.DEVNULL,
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                    # Python creates its descriptors non-inheritable (PEP 446), so there is nothing
+                    # to close and the spawn can skip the pass over open descriptors
+                    close_fds=False,
+                    env=env,
+                    # Own process group, so stop_server can kill the server together with any children
+                    start_new_session=os.name != 'nt'
+                )
+            self._process = process
+            self._invalidate_status_cache()
+            try:
+                with open(LLAMA_SERVER_PID_FILE, "w") as f:
+                    f.write(str(process.pid))
+            except OSError as e:
+                logger.warning(f"Failed to write llama-server PID file: {e}")
             
-            # Check if process is still running
-            if process.poll() is None:
+            # Wait until the server answers health checks, or exits
+            if self._wait_for_server_ready(process):
+                # Warm up the server's own CUDA context and caches without delaying the caller
+                threading.Thread(target=self._warm_up_server, daemon=True).start()
                 # Log initialization success
                 if cuda_available and use_gpu:
                     logger.info(f"✅ LLama server started successfully with GPU acceleration{gpu_info}")
@@ -218,14 +426,86 @@ class LocalLLMService:
                     logger.info("✅ LLama server started successfully in CPU-only mode")
                 return True
             else:
-                stdout, stderr = process.communicate()
-                logger.error(f"Failed to start llama-server: {stderr}")
+                logger.error(f"Failed to start llama-server: {self._read_server_log(log_offset)}")
                 return False
                 
         except Exception as e:
             logger.error(f"Error starting llama-server: {str(e)}")
             return False
 
+    def _warm_up_server(self):
+        """Send a one-token completion, so the first real request doesn't pay the server's warm-up"""
+        try:
+            requests.post(LLAMA_SERVER_COMPLETION_URL, json={"prompt": "hi", "n_predict": 1}, timeout=30)
+            logger.info("llama-server warm-up complete")
+        except requests.RequestException as e:
+            logger.warning(f"llama-server warm-up request failed: {e}")
+
+    def _read_server_log(self, offset: int, max_bytes: int = 8192) -> str:
+        """Read the end of what llama-server wrote to its log file since the given offset"""
+        try:
+            with open(LLAMA_SERVER_LOG_FILE, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(offset, f.tell() - max_bytes))
+                return f.read().decode("utf-8", errors="replace")
+        except OSError as e:
+            return f"<could not read {LLAMA_SERVER_LOG_FILE}: {e}>"
+
+    def _wait_for_server_ready(self, process: subprocess.Popen, timeout: float = LLAMA_SERVER_READY_TIMEOUT) -> bool:
+        """
+        Wait for a freshly started llama-server to become ready
+        
+        Polls the /health endpoint, starting after 50ms and backing off to LLAMA_SERVER_READY_INTERVAL
+        seconds between probes, so a fast start is noticed quickly. Between probes the
+        wait is done on a pidfd where available, so a crashing server is noticed immediately.
+        
+        Args:
+            process: The llama-server process
+            timeout: Maximum number of seconds to wait for the server to report healthy
+            
+        Returns:
+            bool: False if the process exited, True otherwise
+        """
+        pid_poller = None
+        pidfd = None
+        if hasattr(os, "pidfd_open"):
+            try:
+                pidfd = os.pidfd_open(process.pid)
+                pid_poller = select.poll()
+                pid_poller.register(pidfd, select.POLLIN)
+            except OSError:
+                pidfd = None
+                pid_poller = None
+
+        try:
+            deadline = time.monotonic() + timeout
+            interval = 0.05
+            while time.monotonic() < deadline:
+                if process.poll() is not None:
+                    return False
+                try:
+                    response = requests.get(LLAMA_SERVER_HEALTH_URL, timeout=0.5)
+                    if response.status_code == 200:
+                        return True
+                except requests.RequestException:
+                    # Not listening yet
+                    pass
+                if pid_poller is not None:
+                    # Returns as soon as the process exits
+                    pid_poller.poll(interval * 1000)
+                else:
+                    time.sleep(interval)
+                interval = min(interval * 2, LLAMA_SERVER_READY_INTERVAL)
+        finally:
+            if pidfd is not None:
+                os.close(pidfd)
+
+        if process.poll() is not None:
+            return False
+        # Large models can take longer to load; the server is running, so treat it as started
+        logger.warning(f"llama-server not reporting healthy after {timeout} seconds, still loading the model")
+        return True
+
     def stop_server(self) -> ServerStatus:
         """
         Stop the llama-server service.
@@ -237,51 +517,63 @@ class LocalLLMService:
         try:
             if self._stopping_server:
                 logger.info("Server is already in the process of stopping")
-                return self.get_server_status()
+                return self.get_server_status(detailed=True)
             
             self._stopping_server = True
         
             try:
-                # Find all possible llama-server processes and forcibly terminate them
                 terminated_pids = []
-                for proc in psutil.process_iter(["pid", "name", "cmdline"]):
+                # The server started by this process is killed by its process group, no lookup needed
+                process = self._process
+                if process is not None and os.name != 'nt' and process.poll() is None:
+                    logger.info(f"Force terminating llama-server process group, PID: {process.pid}")
                     try:
-                        cmdline = proc.cmdline()
-                        if any("llama-server" in cmd for cmd in cmdline):
-                            pid = proc.pid
-                            logger.info(f"Force terminating llama-server process, PID: {pid}")
-                            
-                            # Directly use kill signal to forcibly terminate
-                            proc.kill()
-                            
-                            # Ensure the process has been terminated
-                            try:
-                                proc.wait(timeout=0.2)  # Slightly increase wait time to ensure process termination
-                                terminated_pids.append(pid)
-                                logger.info(f"Successfully terminated llama-server process {pid}")
-                            except psutil.TimeoutExpired:
-                                # If timeout, try to terminate again
-                                logger.warning(f"Process {pid} still running, sending SIGKILL again")
-                                try:
-                                    import os
-                                    import signal
-                                    os.kill(pid, signal.SIGKILL)  # Use system-level SIGKILL signal
-                                    terminated_pids.append(pid)
-                                    logger.info(f"Successfully force killed llama-server process {pid} with SIGKILL")
-                                except ProcessLookupError:
-                                    # Process no longer exists
-                                    terminated_pids.append(pid)
-                                    logger.info(f"Process {pid} no longer exists after kill attempt")
+                        os.killpg(process.pid, signal.SIGKILL)
+                        process.wait(timeout=1)
+                        terminated_pids.append(process.pid)
+                    except ProcessLookupError:
+                        pass
+                    except subprocess.TimeoutExpired:
+                        logger.warning(f"Process {process.pid} still running after killing its process group")
+                
+                # Find any other llama-server processes and forcibly terminate them
+                procs = []
+                for proc in self._find_server_processes():
+                    try:
+                        logger.info(f"Force terminating llama-server process, PID: {proc.pid}")
+                        # Directly use kill signal to forcibly terminate
+                        proc.kill()
+                        procs.append(proc)
                     except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
                         continue
                 
+                # Wait for all of them at once rather than one after another
+                gone, alive = psutil.wait_procs(procs, timeout=1.0, callback=_log_terminated)
+                for proc in alive:
+                    # If timeout, try to terminate again
+                    logger.warning(f"Process {proc.pid} still running, sending SIGKILL again")
+                    try:
+                        os.kill(proc.pid, signal.SIGKILL)  # Use system-level SIGKILL signal
+                    except ProcessLookupError:
+                        # Process no longer exists
+                        pass
+                if alive:
+                    more_gone, alive = psutil.wait_procs(alive, timeout=0.5, callback=_log_terminated)
+                    gone.extend(more_gone)
+                    for proc in alive:
+                        logger.warning(f"Process {proc.pid} is still running after SIGKILL")
+                terminated_pids.extend(proc.pid for proc in gone)
+                
                 if terminated_pids:
                     logger.info(f"Terminated llama-server processes: {terminated_pids}")
                 else:
                     logger.info("No running llama-server process found")
+                self._clear_pid_file()
+                self._process = None
+                self._invalidate_status_cache()
                 
                 # Check again if any llama-server processes are still running
-                return self.get_server_status()
+                return self.get_server_status(detailed=True)
             
             finally:
                 self._stopping_server = False
@@ -291,118 +583,321 @@ class LocalLLMService:
             self._stopping_server = False
             return ServerStatus.not_running()
 
-    def get_server_status(self) -> ServerStatus:
+    def get_server_status(self, detailed: bool = False) -> ServerStatus:
         """
         Get the current status of llama-server
+        
+        Args:
+            detailed: Whether to collect ProcessInfo (cpu, memory, uptime) for a running server
+            
         Returns: ServerStatus object
         """
         try:
-            base_dir = os.getcwd()
-            server_path = os.path.join(base_dir, "llama.cpp", "build", "bin", "llama-server")
-            server_exec_name = os.path.basename(server_path)
+            # Liveness of the server started by this process is a single waitpid, no /proc reads
+            process = self._process
+            if not detailed and process is not None and process.poll() is None:
+                return ServerStatus(is_running=True, pending_requests=self._pending_requests)
             
-            for proc in psutil.process_iter(["pid", "name", "cmdline"]):
-                try:
-                    cmdline = proc.cmdline()
-                    # Check both for the executable name and the full path
-                    if any(server_exec_name in cmd for cmd in cmdline) or any("llama-server" in cmd for cmd in cmdline):
-                        with proc.oneshot():
-                            process_info = ProcessInfo(
-                                pid=proc.pid,
-                                cpu_percent=proc.cpu_percent(),
-                                memory_percent=proc.memory_percent(),
-                                create_time=proc.create_time(),
-                                cmdline=cmdline,
-                            )
-                            return ServerStatus.running(process_info)
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
-                    
-            return ServerStatus.not_running()
+            # Bursts of status checks within a request share one process lookup
+            checked_at, cached_status = self._status_cache
+            if cached_status is None or time.monotonic() - checked_at >= STATUS_CACHE_TTL:
+                cached_status = self._collect_server_status()
+                self._status_cache = (time.monotonic(), cached_status)
+            if cached_status.is_running:
+                return replace(cached_status, pending_requests=self._pending_requests)
+            return cached_status
             
         except Exception as e:
             logger.error(f"Error checking llama-server status: {str(e)}")
             return ServerStatus.not_running()
 
-    def _parse_response_chunk(self, chunk):
-        """Parse different response chunk formats into a standardized format."""
+    def _collect_server_status(self) -> ServerStatus:
+        """Look up the llama-server process and collect its ProcessInfo"""
+        for proc in self._find_server_processes():
+            try:
+                with proc.oneshot():
+                    process_info = ProcessInfo(
+                        pid=proc.pid,
+                        cpu_percent=proc.cpu_percent(),
+                        memory_percent=proc.memory_percent(),
+                        create_time=proc.create_time(),
+                        cmdline=proc.cmdline(),
+                    )
+                    return ServerStatus.running(process_info)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        return ServerStatus.not_running()
+
+    def _invalidate_status_cache(self):
+        """Forget the cached server status after starting or stopping the server"""
+        self._status_cache = (0.0, None)
+
+    def acquire_inference_slot(self):
+        """Block until one of the server's parallel slots is free
+        
+        Raises:
+            APIError: With code 503 if no slot became free within LLAMA_SLOT_WAIT_TIMEOUT seconds
+        """
+        with self._pending_lock:
+            self._pending_requests += 1
+        try:
+            acquired = self._inflight.acquire(timeout=self._slot_wait_timeout)
+        finally:
+            with self._pending_lock:
+                self._pending_requests -= 1
+        if not acquired:
+            raise APIError(
+                "Local LLM server is busy, please try again later",
+                code=ErrorCodes.SERVICE_UNAVAILABLE,
+            )
+
+    def release_inference_slot(self):
+        """Release a slot taken with acquire_inference_slot"""
+        self._inflight.release()
+
+    def is_local_client(self, client) -> bool:
+        """Check whether client is this service's client for the local llama-server"""
+        return client is not None and client is self._client
+
+    def hold_slot_for_stream(self, stream):
+        """Keep the current inference slot until the given response stream ends or is closed"""
+        return _SlotReleasingStream(stream, self.release_inference_slot)
+
+    def _find_server_processes(self) -> List[psutil.Process]:
+        """
+        Find running llama-server processes
+        
+        Looks up the PID recorded by start_server directly. Only when no live server is recorded,
+        e.g. for a server started outside this service, are all system processes scanned.
+        
+        Returns:
+            List[psutil.Process]: llama-server processes
+        """
+        try:
+            with open(LLAMA_SERVER_PID_FILE, "r") as f:
+                pid = int(f.read().strip())
+        except (OSError, ValueError):
+            pid = None
+
+        if pid is not None:
+            try:
+                proc = psutil.Process(pid)
+                # Guard against the PID having been reused by another process
+                if _is_server_cmdline(proc.cmdline()):
+                    return [proc]
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                pass
+            # The recorded server is gone, but another llama-server may still hold the port
+            self._clear_pid_file()
+
+        if os.path.isdir("/proc/self"):
+            return self._scan_proc_for_server()
+
+        processes = []
+        # Filter on the cheap process name first, so cmdline is only read for llama-server candidates
+        for proc in psutil.process_iter(["pid", "name"]):
+            try:
+                if not (proc.info["name"] or "").startswith("llama-server"):
+                    continue
+                with proc.oneshot():
+                    cmdline = proc.cmdline()
+                if _is_server_cmdline(cmdline):
+                    processes.append(proc)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        return processes
+
+    def _scan_proc_for_server(self) -> List[psutil.Process]:
+        """Find llama-server processes by reading /proc directly (Linux)
+        
+        Reads only the short comm file of each process and the raw cmdline of the candidates,
+        without building a psutil.Process for every process on the system.
+        """
+        processes = []
+        with os.scandir("/proc") as entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                try:
+                    with open(f"/proc/{entry.name}/comm", "rb") as f:
+                        if not f.read().startswith(b"llama-server"):
+                            continue
+                    with open(f"/proc/{entry.name}/cmdline", "rb") as f:
+                        if b"llama-server" not in f.read():
+                            continue
+                    processes.append(psutil.Process(int(entry.name)))
+                except (OSError, psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    # The process exited while scanning, or isn't readable
+                    continue
+        return processes
+
+    def _clear_pid_file(self):
+        """Remove the llama-server PID file if it exists"""
+        try:
+            os.remove(LLAMA_SERVER_PID_FILE)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove llama-server PID file: {e}")
+
+    @staticmethod
+    def _new_stream_context() -> Dict[str, Any]:
+        """Create the id and timestamp shared by all chunks of one streamed completion"""
+        return {
+            # Generated on first use by _stream_id, OpenAI-format chunks carry their own id
+            "id": None,
+            "created": int(time.time()),
+        }
+
+    @staticmethod
+    def _stream_id(stream_ctx: Dict[str, Any]) -> str:
+        """Get the completion id of a stream, generating it once per stream"""
+        if stream_ctx["id"] is None:
+            stream_ctx["id"] = f"chatcmpl-{uuid.uuid4().hex}"
+        return stream_ctx["id"]
+
+    @staticmethod
+    def _format_chunk(stream_ctx: Dict[str, Any], chunk_id: str, system_fingerprint: Optional[str],
+                      content: Optional[str], finish_reason: Optional[str]) -> bytes:
+        """Serialize a chat.completion.chunk, JSON-encoding only the fields that vary per chunk"""
+        return CHUNK_TEMPLATE % (
+            _json_bytes(chunk_id),
+            stream_ctx["created"],
+            _json_bytes(system_fingerprint),
+            _json_bytes(content),
+            _json_bytes(finish_reason),
+        )
+
+    def _parse_response_chunk(self, chunk, stream_ctx: Optional[Dict[str, Any]] = None) -> Optional[bytes]:
+        """Parse different response chunk formats into a standardized format.
+        
+        Args:
+            chunk: Response chunk from the model
+            stream_ctx: Stream context from _new_stream_context, reused across the chunks of one stream
+            
+        Returns:
+            The chunk serialized as a chat.completion.chunk JSON document, or None to skip it
+        """
         try:
+            if stream_ctx is None:
+                stream_ctx = self._new_stream_context()
+
             if chunk is None:
                 logger.warning("Received None chunk")
                 return None
                 
-            # logger.info(f"Parsing response chunk: {chunk}")
             # Handle custom format
             if isinstance(chunk, dict) and "type" in chunk and chunk["type"] == "chat_response":
-                logger.info(f"Processing custom format response: {chunk}")
-                return {
-                    "id": str(uuid.uuid4()),  # Generate a unique ID
-                    "object": "chat.completion.chunk",
-                    "created": int(datetime.now().timestamp()),
-                    "model": "models/lpm",
-                    "system_fingerprint": None,
-                    "choices": [
-                        {
-                            "index": 0,
-                            "delta": {
-                                "content": chunk.get("content", "")
-                            },
-                            "finish_reason": "stop" if chunk.get("done", False) else None
-                        }
-                    ]
-                }
+                logger.debug("Processing custom format response: %s", chunk)
+                return self._format_chunk(
+                    stream_ctx,
+                    self._stream_id(stream_ctx),
+                    None,
+                    chunk.get("content", ""),
+                    "stop" if chunk.get("done", False) else None,
+                )
             
             # Handle OpenAI format
-            if not hasattr(chunk, 'choices'):
+            try:
+                choices = chunk.choices
+            except AttributeError:
                 logger.warning(f"Chunk has no choices attribute: {chunk}")
                 return None
                 
-            choices = getattr(chunk, 'choices', [])
             if not choices:
                 logger.warning("Chunk has empty choices")
                 return None
                 
-            # logger.info(f"Processing OpenAI format response: choices={choices}")
-            delta = choices[0].delta
-            
-            # Create standard response structure
-            response_data = {
-                "id": chunk.id,
-                "object": "chat.completion.chunk",
-                "created": int(datetime.now().timestamp()),
-                "model": "models/lpm",
-                "system_fingerprint": chunk.system_fingerprint if hasattr(chunk, 'system_fingerprint') else None,
-                "choices": [
-                    {
-                        "index": 0,
-                        "delta": {
-                            # Keep even if content is None, let the client handle it
-                            "content": delta.content if hasattr(delta, 'content') else ""
-                        },
-                        "finish_reason": choices[0].finish_reason
-                    }
-                ]
-            }
+            choice = choices[0]
+            content = getattr(choice.delta, 'content', _MISSING)
+            finish_reason = choice.finish_reason
             
             # If there is neither content nor finish_reason, skip
-            if not (hasattr(delta, 'content') or choices[0].finish_reason):
+            if content is _MISSING and not finish_reason:
                 logger.debug("Skipping chunk with no content and no finish_reason")
                 return None
-                
-            return response_data
+
+            return self._format_chunk(
+                stream_ctx,
+                chunk.id,
+                getattr(chunk, 'system_fingerprint', None),
+                # Keep even if content is None, let the client handle it
+                "" if content is _MISSING else content,
+                finish_reason,
+            )
             
         except Exception as e:
             logger.error(f"Error parsing response chunk: {e}, chunk: {chunk}")
             return None
 
-    def handle_stream_response(self, response_iter: Iterator[Any]) -> Response:
-        """Handle streaming response from the LLM server"""
+    @staticmethod
+    def _raw_sse_event(event_lines: List[str]) -> bytes:
+        """Re-frame the lines of one upstream SSE event, reporting the model as models/lpm"""
+        event = ("\n".join(event_lines) + "\n\n").encode('utf-8')
+        return _MODEL_FIELD_PATTERN.sub(LPM_MODEL_FIELD, event, count=1)
+
+    def _iter_raw_sse_events(self, http_response) -> Iterator[Any]:
+        """Split an upstream SSE byte stream into whole events, ending with the [DONE] marker
+        
+        Multi-line events, event: fields and comment lines are kept together in their event.
+        """
+        try:
+            event_lines = []
+            for line in http_response.iter_lines():
+                if line:
+                    event_lines.append(line)
+                    continue
+                # A blank line ends the event
+                if not event_lines:
+                    continue
+                if "data: [DONE]" in event_lines:
+                    yield "[DONE]"
+                    return
+                yield self._raw_sse_event(event_lines)
+                event_lines = []
+            if event_lines:
+                # The upstream closed without a final blank line
+                if "data: [DONE]" in event_lines:
+                    yield "[DONE]"
+                    return
+                yield self._raw_sse_event(event_lines)
+        finally:
+            http_response.close()
+
+    def handle_raw_stream_response(self, http_response) -> Response:
+        """Forward a streaming response from an OpenAI-compatible server without re-encoding it
+        
+        Args:
+            http_response: Streaming HTTP response, e.g. from chat_service.chat(..., raw_stream=True)
+        """
+        return self.handle_stream_response(self._iter_raw_sse_events(http_response), upstream=http_response)
+
+    def handle_stream_response(self, response_iter: Iterator[Any], upstream: Any = None) -> Response:
+        """Handle streaming response from the LLM server
+        
+        Args:
+            response_iter: Chunks or SSE events to stream to the client
+            upstream: Object closed together with response_iter, e.g. the HTTP response the events
+                are read from; needed when response_iter is a generator that may never be started
+        """
         # Create a queue for thread communication
         message_queue = queue.Queue()
         # Create an event flag to notify when model processing is complete
         completion_event = threading.Event()
         # Create a variable to track if heartbeat is needed after first response
         first_response_received = False
+        # Set once generate() starts the model thread, which then closes response_iter itself
+        model_started = threading.Event()
+        
+        def close_response_iter():
+            """Release the upstream connection and any inference slot held by the stream"""
+            for stream in (response_iter, upstream):
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    try:
+                        close()
+                    except Exception as e:
+                        logger.warning(f"[STREAM_DEBUG] Error closing model response stream: {str(e)}")
         
         def heartbeat_thread():
             """Thread function for sending heartbeats"""
@@ -410,48 +905,47 @@ class LocalLLMService:
             heartbeat_interval = 10  # Send heartbeat every 10 seconds
             heartbeat_count = 0
             
-            logger.info("[STREAM_DEBUG] Heartbeat thread started")
+            logger.debug("[STREAM_DEBUG] Heartbeat thread started")
             
             try:
                 # Send initial heartbeat
                 message_queue.put((b": initial heartbeat\n\n", "[INITIAL_HEARTBEAT]"))
-                last_heartbeat_time = time.time()
                 
-                while not completion_event.is_set():
-                    current_time = time.time()
-                    
-                    # Check if we need to send a heartbeat
-                    if current_time - last_heartbeat_time >= heartbeat_interval:
-                        heartbeat_count += 1
-                        elapsed = current_time - start_time
-                        logger.info(f"[STREAM_DEBUG] Sending heartbeat #{heartbeat_count} at {elapsed:.2f}s")
-                        message_queue.put((f": heartbeat #{heartbeat_count}\n\n".encode('utf-8'), "[HEARTBEAT]"))
-                        last_heartbeat_time = current_time
-                    
-                    # Short sleep to prevent CPU spinning
-                    time.sleep(0.1)
+                # Sleep until the next heartbeat is due, waking up right away when the stream completes
+                while not completion_event.wait(heartbeat_interval):
+                    heartbeat_count += 1
+                    elapsed = time.time() - start_time
+                    logger.debug("[STREAM_DEBUG] Sending heartbeat #%d at %.2fs", heartbeat_count, elapsed)
+                    message_queue.put((f": heartbeat #{heartbeat_count}\n\n".encode('utf-8'), "[HEARTBEAT]"))
                 
-                logger.info(f"[STREAM_DEBUG] Heartbeat thread stopping after {heartbeat_count} heartbeats")
+                logger.debug("[STREAM_DEBUG] Heartbeat thread stopping after %d heartbeats", heartbeat_count)
             except Exception as e:
                 logger.error(f"[STREAM_DEBUG] Error in heartbeat thread: {str(e)}", exc_info=True)
-                message_queue.put((f"data: {{\"error\": \"Heartbeat error: {str(e)}\"}}\n\n".encode('utf-8'), "[ERROR]"))
+                message_queue.put((_sse_data({"error": f"Heartbeat error: {str(e)}"}), "[ERROR]"))
         
         def model_response_thread():
             """Thread function for processing model responses"""
             chunk = None
             start_time = time.time()
             chunk_count = 0
+            # Chunks of one completion share their id and creation time
+            stream_ctx = self._new_stream_context()
             
             try:
                 logger.info("[STREAM_DEBUG] Model response thread started")
                 
                 # Process model responses
                 for chunk in response_iter:
+                    # The client went away, stop reading from the model
+                    if completion_event.is_set():
+                        logger.info("[STREAM_DEBUG] Client disconnected, stopping model response thread")
+                        break
+                    
                     current_time = time.time()
                     elapsed_time = current_time - start_time
                     chunk_count += 1
                     
-                    logger.info(f"[STREAM_DEBUG] Received chunk #{chunk_count} after {elapsed_time:.2f}s")
+                    logger.debug("[STREAM_DEBUG] Received chunk #%d after %.2fs", chunk_count, elapsed_time)
                     
                     if chunk is None:
                         logger.warning("[STREAM_DEBUG] Received None chunk, skipping")
@@ -460,62 +954,50 @@ class LocalLLMService:
                     # Check if it's an end marker
                     if chunk == "[DONE]":
                         logger.info(f"[STREAM_DEBUG] Received [DONE] marker after {elapsed_time:.2f}s")
-                        message_queue.put((b"data: [DONE]\n\n", "[DONE]"))
+                        message_queue.put((SSE_DONE, "[DONE]"))
                         break
                     
+                    # Events forwarded unchanged from an OpenAI-compatible server
+                    if isinstance(chunk, bytes):
+                        message_queue.put((chunk, "[CONTENT]"))
+                        continue
+                    
                     # Handle error responses
                     if isinstance(chunk, dict) and "error" in chunk:
                         logger.warning(f"[STREAM_DEBUG] Received error response: {chunk}")
-                        data_str = json.dumps(chunk)
-                        message_queue.put((f"data: {data_str}\n\n".encode('utf-8'), "[ERROR]"))
-                        message_queue.put((b"data: [DONE]\n\n", "[DONE]"))
+                        message_queue.put((_sse_data(chunk), "[ERROR]"))
+                        message_queue.put((SSE_DONE, "[DONE]"))
                         break
                     
                     # Handle normal responses
-                    response_data = self._parse_response_chunk(chunk)
+                    response_data = self._parse_response_chunk(chunk, stream_ctx)
                     if response_data:
-                        data_str = json.dumps(response_data)
-                        content = response_data.get("choices", [{}])[0].get("delta", {}).get("content", "")
-                        content_length = len(content) if content else 0
-                        logger.info(f"[STREAM_DEBUG] Sending chunk #{chunk_count}, content length: {content_length}, elapsed: {elapsed_time:.2f}s")
-                        message_queue.put((f"data: {data_str}\n\n".encode('utf-8'), "[CONTENT]"))
+                        logger.debug("[STREAM_DEBUG] Sending chunk #%d, payload length: %d, elapsed: %.2fs", chunk_count, len(response_data), elapsed_time)
+                        message_queue.put((b"data: " + response_data + b"\n\n", "[CONTENT]"))
                     else:
-                        logger.warning(f"[STREAM_DEBUG] Parsed response data is None for chunk #{chunk_count}")
+                        logger.debug("[STREAM_DEBUG] Parsed response data is None for chunk #%d", chunk_count)
                 
                 # Handle the case where no responses were received
                 if chunk_count == 0:
                     logger.info("[STREAM_DEBUG] No chunks received, sending empty message")
-                    thinking_message = {
-                        "id": str(uuid.uuid4()),
-                        "object": "chat.completion.chunk",
-                        "created": int(datetime.now().timestamp()),
-                        "model": "models/lpm",
-                        "system_fingerprint": None,
-                        "choices": [
-                            {
-                                "index": 0,
-                                "delta": {
-                                    "content": ""  # Empty content won't affect frontend display
-                                },
-                                "finish_reason": None
-                            }
-                        ]
-                    }
-                    data_str = json.dumps(thinking_message)
-                    message_queue.put((f"data: {data_str}\n\n".encode('utf-8'), "[THINKING]"))
+                    # Empty content won't affect frontend display
+                    thinking_message = self._format_chunk(stream_ctx, self._stream_id(stream_ctx), None, "", None)
+                    message_queue.put((b"data: " + thinking_message + b"\n\n", "[THINKING]"))
                 
                 # Model processing is complete, send end marker
                 if chunk != "[DONE]":
                     logger.info(f"[STREAM_DEBUG] Sending final [DONE] marker after {elapsed_time:.2f}s")
-                    message_queue.put((b"data: [DONE]\n\n", "[DONE]"))
+                    message_queue.put((SSE_DONE, "[DONE]"))
                 
             except Exception as e:
                 logger.error(f"[STREAM_DEBUG] Error processing model response: {str(e)}", exc_info=True)
-                message_queue.put((f"data: {{\"error\": \"{str(e)}\"}}\n\n".encode('utf-8'), "[ERROR]"))
-                message_queue.put((b"data: [DONE]\n\n", "[DONE]"))
+                message_queue.put((_sse_data({"error": str(e)}), "[ERROR]"))
+                message_queue.put((SSE_DONE, "[DONE]"))
             finally:
                 # Set completion event to notify heartbeat thread to stop
                 completion_event.set()
+                # Release the upstream connection, also when the client disconnected mid-stream
+                close_response_iter()
                 logger.info(f"[STREAM_DEBUG] Model response thread completed with {chunk_count} chunks")
         
         def generate():
@@ -526,6 +1008,7 @@ class LocalLLMService:
             
             # Start model response processing thread
             model_thread = threading.Thread(target=model_response_thread, daemon=True)
+            model_started.set()
             model_thread.start()
             
             try:
@@ -534,8 +1017,17 @@ class LocalLLMService:
                     try:
                         # Use short timeout to get message, prevent blocking
                         message, message_type = message_queue.get(timeout=0.1)
-                        logger.debug(f"[STREAM_DEBUG] Yielding message type: {message_type}")
-                        yield message
+                        # Coalesce events that are already queued into one write, without
+                        # waiting for more, so bursts of tokens don't cost a WSGI write each
+                        batch = bytearray(message)
+                        while message_type != "[DONE]" and len(batch) < STREAM_BATCH_BYTES:
+                            try:
+                                message, message_type = message_queue.get_nowait()
+                            except queue.Empty:
+                                break
+                            batch += message
+                        logger.debug("[STREAM_DEBUG] Yielding %d bytes, last message type: %s", len(batch), message_type)
+                        yield bytes(batch)
                         
                         # If end marker is received, exit loop
                         if message_type == "[DONE]":
@@ -546,7 +1038,7 @@ class LocalLLMService:
                         # Check if model thread has completed but didn't send [DONE]
                         if completion_event.is_set() and not model_thread.is_alive():
                             logger.warning("[STREAM_DEBUG] Model thread completed without [DONE], ending generator")
-                            yield b"data: [DONE]\n\n"
+                            yield SSE_DONE
                             break
                         pass
             except GeneratorExit:
@@ -556,8 +1048,8 @@ class LocalLLMService:
             except Exception as e:
                 logger.error(f"[STREAM_DEBUG] Error in generator: {str(e)}", exc_info=True)
                 try:
-                    yield f"data: {{\"error\": \"Generator error: {str(e)}\"}}\n\n".encode('utf-8')
-                    yield b"data: [DONE]\n\n"
+                    yield _sse_data({"error": f"Generator error: {str(e)}"})
+                    yield SSE_DONE
                 except:
                     pass
                 completion_event.set()
@@ -572,7 +1064,7 @@ class LocalLLMService:
                 logger.info("[STREAM_DEBUG] Generator completed")
         
         # Return response
-        return Response(
+        response = Response(
             generate(),
             mimetype='text/event-stream',
             headers={
@@ -583,6 +1075,15 @@ class LocalLLMService:
             }
         )
 
+        @response.call_on_close
+        def close_unread_stream():
+            # The response was closed before it was read (e.g. the client went away first),
+            # so no model thread exists to release the upstream stream and its inference slot
+            if not model_started.is_set():
+                close_response_iter()
+
+        return response
+
 
 # Global instance
 local_llm_service = LocalLLMService()
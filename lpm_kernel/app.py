@@ -56,7 +56,10 @@ def create_app():
     return app
 
 
-app = create_app()
+# Chunking worker processes are spawned and import the main module as __mp_main__; when the
+# app is started as the main module (python -m lpm_kernel.app) they must not build it again
+if __name__ != "__mp_main__":
+    app = create_app()
 
 
 @atexit.register
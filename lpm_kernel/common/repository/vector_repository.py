@@ -4,6 +4,7 @@ from chromadb.errors import IDAlreadyExistsError
 from typing import List, Dict, Optional
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from lpm_kernel.file_data.chroma_utils import get_collection_metadata
 
 
 @dataclass
@@ -25,7 +26,12 @@ class BaseVectorRepository(ABC):
 
 
 class ChromaRepository(BaseVectorRepository):
-    def __init__(self, collection_name: str, persist_directory: str = "./chroma_db"):
+    def __init__(
+        self,
+        collection_name: str,
+        persist_directory: str = "./chroma_db",
+        dimension: int = 1536,
+    ):
         self.client = chromadb.PersistentClient(path=persist_directory)
 
         # Check if collection exists, create it if it doesn't
@@ -34,7 +40,7 @@ class ChromaRepository(BaseVectorRepository):
         except ValueError:  # ValueError is thrown when Collection does not exist
             self.collection = self.client.create_collection(
                 name=collection_name,
-                metadata={"hnsw:space": "cosine", "dimension": 1536},
+                metadata=get_collection_metadata(dimension),
             )
 
     def add(self, documents: List[VectorDocument]) -> None:
@@ -3,6 +3,10 @@
 from typing import Optional
 from .vector_repository import ChromaRepository, BaseVectorRepository
 from lpm_kernel.configs.config import Config
+from lpm_kernel.configs.logging import get_train_process_logger
+from lpm_kernel.file_data.chroma_utils import detect_embedding_model_dimension
+
+logger = get_train_process_logger()
 
 
 class VectorStoreFactory:
@@ -15,5 +19,19 @@ class VectorStoreFactory:
             cls._instance = ChromaRepository(
                 collection_name=config.CHROMA_COLLECTION_NAME,
                 persist_directory=config.CHROMA_PERSIST_DIRECTORY,
+                dimension=cls._detect_dimension(),
             )
         return cls._instance
+
+    @staticmethod
+    def _detect_dimension() -> int:
+        """Detect the embedding dimension from the user's embedding model, defaulting to OpenAI's 1536"""
+        try:
+            from lpm_kernel.api.services.user_llm_config_service import UserLLMConfigService
+
+            user_llm_config = UserLLMConfigService().get_available_llm()
+            if user_llm_config and user_llm_config.embedding_model_name:
+                return detect_embedding_model_dimension(user_llm_config.embedding_model_name)
+        except Exception as e:
+            logger.error(f"Error detecting embedding dimension, using default: 1536. Error: {str(e)}")
+        return 1536
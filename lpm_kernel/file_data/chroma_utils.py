@@ -61,6 +61,27 @@ def detect_embedding_model_dimension(model_name: str) -> Optional[int]:
     return 1536
 
 
+def get_collection_metadata(dimension: int = 1536) -> Dict[str, Any]:
+    """
+    Build the metadata used when creating a ChromaDB collection
+    HNSW parameters can be tuned through environment variables; ChromaDB only applies them at creation time
+    
+    Args:
+        dimension: The embedding dimension of the collection
+        
+    Returns:
+        The collection metadata, including distance space, HNSW parameters and dimension
+    """
+    return {
+        "hnsw:space": "cosine",
+        "hnsw:M": int(os.getenv("CHROMA_HNSW_M", "16")),
+        "hnsw:construction_ef": int(os.getenv("CHROMA_HNSW_CONSTRUCTION_EF", "100")),
+        "hnsw:search_ef": int(os.getenv("CHROMA_HNSW_SEARCH_EF", "64")),
+        "hnsw:batch_size": int(os.getenv("CHROMA_HNSW_BATCH_SIZE", "250")),
+        "dimension": dimension
+    }
+
+
 def reinitialize_chroma_collections(dimension: int = 1536) -> bool:
     """
     Reinitialize ChromaDB collections with a new dimension
@@ -92,10 +113,7 @@ def reinitialize_chroma_collections(dimension: int = 1536) -> bool:
         try:
             client.create_collection(
                 name="documents",
-                metadata={
-                    "hnsw:space": "cosine",
-                    "dimension": dimension
-                }
+                metadata=get_collection_metadata(dimension)
             )
             logger.info(f"Created 'documents' collection with dimension {dimension}")
         except Exception as e:
@@ -119,10 +137,7 @@ def reinitialize_chroma_collections(dimension: int = 1536) -> bool:
         try:
             client.create_collection(
                 name="document_chunks",
-                metadata={
-                    "hnsw:space": "cosine",
-                    "dimension": dimension
-                }
+                metadata=get_collection_metadata(dimension)
             )
             logger.info(f"Created 'document_chunks' collection with dimension {dimension}")
         except Exception as e:
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import List
 from lpm_kernel.L1.bio import Chunk
 import traceback
@@ -49,3 +50,17 @@ class DocumentChunker:
             logger.error(f"Error in split method: {str(e)}")
             logger.error(traceback.format_exc())
             raise
+
+
+@lru_cache(maxsize=4)
+def get_chunker(chunk_size: int, overlap: int) -> DocumentChunker:
+    """Return a DocumentChunker shared by every caller in this process with the same settings"""
+    return DocumentChunker(chunk_size=chunk_size, overlap=overlap)
+
+
+def split_content(content: str, chunk_size: int, overlap: int) -> List[Chunk]:
+    """Split content with a chunker cached per process.
+
+    Module-level so it can be pickled and run in a process pool worker.
+    """
+    return get_chunker(chunk_size, overlap).split(content)
@@ -1,5 +1,5 @@
 from typing import List, Optional, Dict
-from sqlalchemy import select
+from sqlalchemy import func, select
 from lpm_kernel.common.repository.base_repository import BaseRepository
 from lpm_kernel.file_data.document import Document
 from lpm_kernel.file_data.process_status import ProcessStatus
@@ -38,6 +38,16 @@ class DocumentRepository(BaseRepository[Document]):
             result = session.execute(query)
             return [Document.to_dto(doc) for doc in result.scalars().all()]
 
+    def find_with_content(self) -> List[Document]:
+        """search docs that have non-empty raw_content"""
+        with self._db.session() as session:
+            query = select(self.model).where(
+                self.model.raw_content.isnot(None),
+                func.length(self.model.raw_content) > 0,
+            )
+            results = session.scalars(query).all()
+            return [self.model.from_dict(item.to_dict()) for item in results]
+
     def find_chunks(self, document_id: int) -> List[ChunkDTO]:
         """search all chunks of the specified document"""
         with self._db.session() as session:
@@ -68,6 +78,13 @@ class DocumentRepository(BaseRepository[Document]):
             session.refresh(chunk)
             return chunk
 
+    def save_chunks(self, chunks: List[ChunkModel]) -> None:
+        """save multiple chunks in a single transaction"""
+        if not chunks:
+            return
+        with self._db.session() as session:
+            session.add_all(chunks)
+
     def find_one(self, document_id: int) -> Optional[DocumentDTO]:
         """search doc by id"""
         with self._db.session() as session:
@@ -100,6 +117,19 @@ class DocumentRepository(BaseRepository[Document]):
             result = session.execute(query)
             return [Document.to_dto(doc) for doc in result.scalars().all()]
 
+    def find_unembedding_ids(self) -> List[int]:
+        """search ids of unembedding documents without loading their content"""
+        with self._db.session() as session:
+            query = select(self.model.id).where(
+                self.model.embedding_status.in_([ProcessStatus.INITIALIZED, ProcessStatus.FAILED])
+            )
+            return list(session.scalars(query).all())
+
+    def find_all_ids(self) -> List[int]:
+        """search ids of all documents without loading their content"""
+        with self._db.session() as session:
+            return list(session.scalars(select(self.model.id)).all())
+
     def update_embedding_status(self, document_id: int, status: ProcessStatus) -> None:
         """update doc embedding"""
         try:
@@ -58,6 +58,22 @@ class DocumentService:
         """
         return self._repository.list()
 
+    def list_documents_with_content(self) -> List[Document]:
+        """
+        get docs that have non-empty raw content
+        Returns:
+            List[Document]: doc object list
+        """
+        return self._repository.find_with_content()
+
+    def list_document_ids(self) -> List[int]:
+        """
+        get all doc IDs without loading doc content
+        Returns:
+            List[int]: doc ID list
+        """
+        return self._repository.find_all_ids()
+
     def page_documents(self, page: int, page_size: int) -> List[Document]:
         """
         get paginated doc list
@@ -12,7 +12,7 @@ logger = get_train_process_logger()
 
 class EmbeddingService:
     def __init__(self):
-        from lpm_kernel.file_data.chroma_utils import detect_embedding_model_dimension
+        from lpm_kernel.file_data.chroma_utils import detect_embedding_model_dimension, get_collection_metadata
         from lpm_kernel.api.services.user_llm_config_service import UserLLMConfigService
         
         chroma_path = os.getenv("CHROMA_PERSIST_DIRECTORY", "./data/chroma_db")
@@ -69,7 +69,7 @@ class EmbeddingService:
             # Collection doesn't exist, create it with the correct dimension
             try:
                 self.document_collection = self.client.create_collection(
-                    name="documents", metadata={"hnsw:space": "cosine", "dimension": self.dimension}
+                    name="documents", metadata=get_collection_metadata(self.dimension)
                 )
                 logger.info(f"Created 'documents' collection with dimension {self.dimension}")
             except Exception as e:
@@ -88,7 +88,7 @@ class EmbeddingService:
             # Collection doesn't exist, create it with the correct dimension
             try:
                 self.chunk_collection = self.client.create_collection(
-                    name="document_chunks", metadata={"hnsw:space": "cosine", "dimension": self.dimension}
+                    name="document_chunks", metadata=get_collection_metadata(self.dimension)
                 )
                 logger.info(f"Created 'document_chunks' collection with dimension {self.dimension}")
             except Exception as e:
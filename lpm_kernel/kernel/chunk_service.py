@@ -1,5 +1,6 @@
 # file_data/service.py
 import logging
+from typing import List
 
 from lpm_kernel.L1.bio import Chunk
 from lpm_kernel.common.repository.database_session import DatabaseSession
@@ -76,6 +77,30 @@ class ChunkService:
             logger.error(f"Error saving chunk: {str(e)}")
             raise
 
+    def save_chunks(self, chunks: List[Chunk]) -> None:
+        """
+        Save multiple document chunks to database in a single transaction
+        Args:
+            chunks (List[Chunk]): Chunk objects to save
+        Raises:
+            Exception: Error when saving fails
+        """
+        try:
+            chunk_models = [
+                ChunkModel(
+                    document_id=chunk.document_id,
+                    content=chunk.content,
+                    tags=chunk.tags,
+                    topic=chunk.topic,
+                )
+                for chunk in chunks
+            ]
+            self._repository.save_chunks(chunk_models)
+            logger.debug(f"Saved {len(chunk_models)} chunks")
+        except Exception as e:
+            logger.error(f"Error saving chunks: {str(e)}")
+            raise
+
 
 # Usage elsewhere:
 # from lpm_kernel.kernel import chunk_service
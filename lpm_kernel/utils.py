@@ -1,13 +1,21 @@
 import logging
 from enum import Enum
+from functools import lru_cache
 import tiktoken
 import re
-from typing import Any, Optional, Union, Collection, AbstractSet, Literal, List
+from typing import Any, Optional, Union, Collection, AbstractSet, Literal, List, Tuple
 from langchain.text_splitter import TextSplitter
 import random
 import string
-from itertools import chain
+from bisect import bisect_right
+from itertools import accumulate, chain
 import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from lpm_kernel.configs.logging import get_train_process_logger
 logger = get_train_process_logger()
 
@@ -32,6 +40,38 @@ def select_language_desc(
         return default_desc
 
 
+@lru_cache(maxsize=16)
+def _get_encoder(encoding_name: str = "cl100k_base", model_name: Optional[str] = None):
+    # Resolve the tokenizer once per (encoding, model) pair; tiktoken encoders are immutable and safe to share
+    if model_name is not None:
+        if model_name in tiktoken.model.MODEL_TO_ENCODING:
+            logging.info(f"Successfully initialized tokenizer for model: {model_name}")
+            return tiktoken.encoding_for_model(model_name)
+        logging.warning(f"Model '{model_name}' doesn't have a corresponding tokenizer, falling back to default: {encoding_name}")
+        return tiktoken.get_encoding(encoding_name)
+    logging.info(f"No model specified, using default tokenizer: {encoding_name}")
+    return tiktoken.get_encoding(encoding_name)
+
+
+# encode_batch starts a thread pool on every call, which only pays off for long lists of texts
+ENCODE_BATCH_MIN_TEXTS = 64
+
+
+def _count_tokens(enc, texts: List[str], allowed_special, disallowed_special) -> List[int]:
+    """Token count of each text, batch-encoded only when the list is long enough"""
+    if len(texts) < ENCODE_BATCH_MIN_TEXTS:
+        return [
+            len(enc.encode(text, allowed_special=allowed_special, disallowed_special=disallowed_special))
+            for text in texts
+        ]
+    return [
+        len(ids)
+        for ids in enc.encode_batch(
+            texts, allowed_special=allowed_special, disallowed_special=disallowed_special
+        )
+    ]
+
+
 def cal_upperbound(
     model_limit: int = 4096,
     generage_limit: int = 512,
@@ -45,16 +85,7 @@ def cal_upperbound(
     :param raw: system prompt and raw content
     :return:
     """
-    if model_name is not None:
-        if model_name in tiktoken.model.MODEL_TO_ENCODING:
-            enc = tiktoken.encoding_for_model(model_name)
-            logging.info(f"Successfully initialized tokenizer for model: {model_name}")
-        else:
-            enc = tiktoken.get_encoding("cl100k_base")
-            logging.warning(f"Model '{model_name}' doesn't have a corresponding tokenizer, falling back to default: cl100k_base")
-    else:
-        enc = tiktoken.get_encoding("cl100k_base")
-        logging.info(f"No model specified, using default tokenizer: cl100k_base")
+    enc = _get_encoder("cl100k_base", model_name)
     raw_token = len(enc.encode(raw))
     upper_bound = model_limit - raw_token - tolerance - generage_limit
     if upper_bound < 0:
@@ -71,6 +102,7 @@ def equidistant_filter(chunks, separator, filtered_chunks_n=6):
         for i in range(int(len(chunks) / gap) + 1)
         if (gap * i < len(chunks) - 2)
     ]
+    # Return a list rather than a generator: chunk_filter feeds this to str.join, which materializes any iterable anyway
     filtered_chunks = [chunks[i] for i in indexes]
     filtered_chunks.append(separator.join(chunks[-2:]))
     return filtered_chunks
@@ -81,14 +113,27 @@ def tab_or_space_replacement(match):
     return "\t" if "\t" in match.group() else " "
 
 
+_URL_PATTERN = re.compile(
+    r"(https?|ftp|file)://[-A-Za-z0-9+&@#/%?=~_|!:,.;\u4e00-\u9fa5]+[-A-Za-z0-9+&@#/%=~_|]"
+)
+# Only split when there are multiple newlines, as parsing of PDF/Word often contains false newlines
+_HEAD_TAIL_SPLIT_PATTERN = re.compile(r"\. |! |\? |。|！|？|\n+ *\n+")
+_SUMMARY_JSON_PATTERN = re.compile(r"\{.*(\}|\]|\,)", re.DOTALL)
+
+# The two character classes are disjoint, so both rules can be applied in a single scan
+_WHITESPACE_RUN_PATTERN = re.compile(r"(?P<tab_space>[ \t]{3,})|(?P<wordwrap>[\n\f\r\v]{3,})")
+
+
+def whitespace_run_replacement(match):
+    # Three or more spaces or tabs collapse to a single tab/space;
+    # multiple consecutive \n (newline), \f (form feed), \r (carriage return), \v (vertical tab) collapse to 2 newlines
+    if match.group("tab_space"):
+        return tab_or_space_replacement(match)
+    return "\n\n"
+
+
 def text_filter(text: str) -> str:
-    pattern_tab_space = "[ \t]{3,}"
-    pattern_wordwrap = "[\n\f\r\v]{3,}"
-    # Replace when encountering three or more spaces or tabs
-    replaced_text = re.sub(pattern_tab_space, tab_or_space_replacement, text)
-    # When there are multiple consecutive \n (newline), \f (form feed), \r (carriage return), \v (vertical tab), replace them with 2 original newlines
-    replaced_text = re.sub(pattern_wordwrap, "\n\n", replaced_text)
-    return replaced_text
+    return _WHITESPACE_RUN_PATTERN.sub(whitespace_run_replacement, text)
 
 
 ALLOW_SPECIAL_TOKEN = {"<|endofprompt|>", "<|endoftext|>"}
@@ -116,26 +161,8 @@ class TokenTextSplitter(TextSplitter):
     ):
         """Create a new TextSplitter."""
         super().__init__(**kwargs)
-        try:
-            import tiktoken
-        except ImportError:
-            raise ValueError(
-                "Could not import tiktoken python package. "
-                "This is needed in order to for TokenTextSplitter. "
-                "Please it install it with `pip install tiktoken`."
-            )
         # create a GPT-3 encoder instance
-        if model_name is not None:
-            if model_name in tiktoken.model.MODEL_TO_ENCODING:
-                enc = tiktoken.encoding_for_model(model_name)
-                logging.info(f"Successfully initialized tokenizer for model: {model_name}")
-            else:
-                enc = tiktoken.get_encoding(encoding_name)
-                logging.warning(f"Model '{model_name}' doesn't have a corresponding tokenizer, falling back to default: {encoding_name}")
-        else:
-            enc = tiktoken.get_encoding(encoding_name)
-            logging.info(f"No model specified, using default tokenizer: {encoding_name}")
-        self._tokenizer = enc
+        self._tokenizer = _get_encoder(encoding_name, model_name)
         self._allowed_special = allowed_special
         self._disallowed_special = disallowed_special
 
@@ -150,56 +177,37 @@ class TokenTextSplitter(TextSplitter):
             disallowed_special=self._disallowed_special,
         )
 
-        start_idx = 0
-        while start_idx < len(input_ids):
-            cur_idx = min(start_idx + self._chunk_size, len(input_ids))
-            chunk_ids = input_ids[start_idx:cur_idx]
-            s = self._tokenizer.decode(chunk_ids).strip()
+        # Slice all windows first and decode them in one batch rather than one tiktoken call per chunk
+        chunk_ids_list = [
+            input_ids[start_idx : start_idx + self._chunk_size]
+            for start_idx in range(
+                0, len(input_ids), self._chunk_size - self._chunk_overlap
+            )
+        ]
+        for s in self._tokenizer.decode_batch(chunk_ids_list):
+            s = s.strip()
             if s:
                 s = self._cut_meaningless_head_tail(s)
                 if s:
                     splits.append(s)
-            start_idx += self._chunk_size - self._chunk_overlap
         logging.debug("finished split_text(): %s splits", len(splits))
         return splits
 
     def _cut_meaningless_head_tail(self, text: str) -> str:
-        # Only split when there are multiple newlines, as parsing of PDF/Word often contains false newlines
-        sentences = re.split("\. |! |\? |。|！|？|\n+ *\n+", text)
+        sentences = _HEAD_TAIL_SPLIT_PATTERN.split(text)
         if len(sentences) < 2:
             return text
         head = sentences[0]
         body = ". ".join(sentences[1:-1])
         tail = sentences[-1]
-        head_len = len(
-            self._tokenizer.encode(
-                body,
-                allowed_special=self._allowed_special,
-                disallowed_special=self._disallowed_special,
-            )
-        )
-        body_len = len(
-            self._tokenizer.encode(
-                body,
-                allowed_special=self._allowed_special,
-                disallowed_special=self._disallowed_special,
-            )
-        )
-        tail_len = len(
-            self._tokenizer.encode(
-                tail,
-                allowed_special=self._allowed_special,
-                disallowed_special=self._disallowed_special,
-            )
-        )
         parts = []
         # Use length to roughly estimate the impact of discarding the tail; if the impact is not significant, discard it
-        # Rough estimate: Chinese 20 tokens, 8 characters; English 10 tokens, 30 characters
-        if head_len >= 20 or len(head) >= 30:
+        if self._is_significant_fragment(head):
             parts.append(head)
-        if body_len > 0:
+        # Any non-empty body encodes to at least one token, so it never needs tokenizing
+        if body:
             parts.append(body)
-        if tail_len >= 20 or len(tail) >= 30:
+        if self._is_significant_fragment(tail):
             parts.append(tail)
         res = "\n".join(parts)
 
@@ -210,6 +218,20 @@ class TokenTextSplitter(TextSplitter):
         )
         return res
 
+    def _is_significant_fragment(self, fragment: str) -> bool:
+        # Rough estimate: Chinese 20 tokens, 8 characters; English 10 tokens, 30 characters
+        # The character count is free, so only fragments shorter than 30 characters get tokenized
+        if len(fragment) >= 30:
+            return True
+        n_tokens = len(
+            self._tokenizer.encode(
+                fragment,
+                allowed_special=self._allowed_special,
+                disallowed_special=self._disallowed_special,
+            )
+        )
+        return n_tokens >= 20
+
 
 def chunk_filter(
     chunks, filter, filtered_chunks_n=6, separator="\n", spacer="\n……\n……\n……\n"
@@ -220,23 +242,15 @@ def chunk_filter(
 
 
 def get_safe_content_turncate(content, model_name="gpt-3.5-turbo", max_tokens=3300):
-    if model_name is not None:
-        if model_name in tiktoken.model.MODEL_TO_ENCODING:
-            enc = tiktoken.encoding_for_model(model_name)
-            logging.info(f"Successfully initialized tokenizer for model: {model_name}")
-        else:
-            enc = tiktoken.get_encoding("cl100k_base")
-            logging.warning(f"Model '{model_name}' doesn't have a corresponding tokenizer, falling back to default: cl100k_base")
-    else:
-        enc = tiktoken.get_encoding("cl100k_base")
-        logging.info(f"No model specified, using default tokenizer: cl100k_base")
+    enc = _get_encoder("cl100k_base", model_name)
+    tokens = enc.encode(content)
     logging.warning(
         "get_safe_content_turncate(): current model maximum input length is %s, current input length is %s",
         max_tokens,
-        len(enc.encode(content)),
+        len(tokens),
     )
-    if len(enc.encode(content)) > max_tokens:
-        content = enc.decode(enc.encode(content)[:max_tokens])
+    if len(tokens) > max_tokens:
+        content = enc.decode(tokens[:max_tokens])
     return content
 
 
@@ -272,10 +286,7 @@ def get_urls(string):
     if not string:
         return url_arr
 
-    pattern = re.compile(
-        r"(https?|ftp|file)://[-A-Za-z0-9+&@#/%?=~_|!:,.;\u4e00-\u9fa5]+[-A-Za-z0-9+&@#/%=~_|]"
-    )
-    matcher = pattern.finditer(string)
+    matcher = _URL_PATTERN.finditer(string)
 
     for match in matcher:
         url_arr.append(match.group())
@@ -298,20 +309,37 @@ def get_random_strings(n: int, s_length: int) -> List[str]:
     return list(unique_strings)
 
 
+# Below this many literals, plain str.replace passes are cheaper than compiling an alternation
+REPLACE_LITERALS_REGEX_MIN = 8
+
+
+@lru_cache(maxsize=32)
+def _literal_pattern(keys: Tuple[str, ...]):
+    # Longer keys are tried first so prefixes never win
+    return re.compile("|".join(re.escape(key) for key in sorted(keys, key=len, reverse=True)))
+
+
+def replace_literals(text, replacements):
+    # Substitute every key of replacements; large mappings are applied in a single regex scan
+    if len(replacements) < REPLACE_LITERALS_REGEX_MIN:
+        for old, new in replacements.items():
+            text = text.replace(old, new)
+        return text
+    pattern = _literal_pattern(tuple(replacements))
+    return pattern.sub(lambda match: replacements[match.group(0)], text)
+
+
 def encode_urls(text, random_string_len: int = 16):
     urls = get_urls(text)
     random_strings = get_random_strings(len(urls), random_string_len)
     url2string_dict = dict(zip(urls, random_strings))
     string2url_dict = dict(zip(random_strings, urls))
-    for url, random_string in url2string_dict.items():
-        text = text.replace(url, random_string)
+    text = replace_literals(text, url2string_dict)
     return text, string2url_dict
 
 
 def decode_urls(text, string2url_dict):
-    for random_string, url in string2url_dict.items():
-        text = text.replace(random_string, url)
-    return text
+    return replace_literals(text, string2url_dict)
 
 
 class TokenParagraphSplitter(TextSplitter):
@@ -354,19 +382,40 @@ class TokenParagraphSplitter(TextSplitter):
     ):
         """Create a new TextSplitter."""
         super().__init__(**kwargs)
-        try:
-            import tiktoken
-        except ImportError:
-            raise ValueError(
-                "Could not import tiktoken python package. "
-                "This is needed in order to for TokenTextSplitter. "
-                "Please it install it with `pip install tiktoken`."
-            )
         # create a GPT-3 encoder instance
-        self._tokenizer = tiktoken.get_encoding(encoding_name)
+        self._tokenizer = _get_encoder(encoding_name)
         self._allowed_special = allowed_special
         self._disallowed_special = disallowed_special
 
+        # Compile the split patterns once per splitter; they only depend on the character sets above
+        line_break_characters = "".join(self.line_break_characters)
+        whitespace_characters = "".join(self.whitespace_characters)
+        self._paragraph_pattern = re.compile(
+            f"([{line_break_characters}]+[{whitespace_characters}]*[{line_break_characters}])+"
+        )
+        self._sentence_pattern = re.compile(
+            f"({'|'.join(re.escape(symbol) for symbol in self.sentence_terminators)})+"
+        )
+        self._open_symbols_dict = {
+            open_sym: close_sym for open_sym, close_sym in self.paired_punctuation
+        }
+        self._close_symbols_dict = {
+            close_sym: open_sym for open_sym, close_sym in self.paired_punctuation
+        }
+        # Only paired punctuation and line breaks affect sentence recombination, so scan for those characters alone
+        self._recombine_pattern = re.compile(
+            "["
+            + "".join(
+                re.escape(c)
+                for c in chain(
+                    self._open_symbols_dict,
+                    self._close_symbols_dict,
+                    self.line_break_characters,
+                )
+            )
+            + "]"
+        )
+
     def split_text(self, text: str) -> List[str]:
         chunks = []
 
@@ -415,12 +464,7 @@ class TokenParagraphSplitter(TextSplitter):
         self, text: str, min_paragraph_length: int = 0
     ) -> List[str]:
         """Currently split the original document into paragraphs directly based on the \n[any space]\n rule."""
-        line_break_characters = "".join(self.line_break_characters)
-        whitespace_characters = "".join(self.whitespace_characters)
-        paragraphs = re.split(
-            f"([{line_break_characters}]+[{whitespace_characters}]*[{line_break_characters}])+",
-            text,
-        )
+        paragraphs = self._paragraph_pattern.split(text)
         if len(paragraphs) % 2 == 1:
             paragraphs = [""] + paragraphs
         paragraphs = [
@@ -453,18 +497,16 @@ class TokenParagraphSplitter(TextSplitter):
 
     def _split_to_sentences(self, text: str, url_strings: List[str] = []) -> List[str]:
         # Use capture groups to preserve sentence separators
-        pattern = (
-            f"({'|'.join(re.escape(symbol) for symbol in self.sentence_terminators)})+"
-        )
-        parts = re.split(pattern, text)
-        sentences = []
+        parts = self._sentence_pattern.split(text)
         # Merge by skipping steps to ensure punctuation is added to the end of the corresponding sentence
         if len(parts) % 2 == 1:
             parts.append("")
 
-        sentences = ["".join(parts[i : i + 2]) for i in range(0, len(parts), 2)]
-
-        sentences = [s for s in sentences if s.strip()]
+        sentences = [
+            sentence
+            for sentence in map(str.__add__, parts[0::2], parts[1::2])
+            if sentence.strip()
+        ]
 
         if not sentences:
             return []
@@ -484,13 +526,6 @@ class TokenParagraphSplitter(TextSplitter):
         if len(sentences) < 2:
             return sentences
 
-        open_symbols_dict = {
-            open_sym: close_sym for open_sym, close_sym in self.paired_punctuation
-        }
-        close_symbols_dict = {
-            close_sym: open_sym for open_sym, close_sym in self.paired_punctuation
-        }
-
         new_sentences = []
         cur_sentences = ""
         unmatched_symbol = []
@@ -503,23 +538,27 @@ class TokenParagraphSplitter(TextSplitter):
                 new_sentences.append(cur_sentences)
                 cur_sentences = ""
 
-            for c in sent:
-                if c in open_symbols_dict:
+            # Jump between the characters that matter and append the text in between as whole slices
+            pos = 0
+            for match in self._recombine_pattern.finditer(sent):
+                c = match.group()
+                if c in self._open_symbols_dict:
                     unmatched_symbol.append(c)
-                elif c in close_symbols_dict:
+                elif c in self._close_symbols_dict:
                     if (
                         unmatched_symbol
-                        and unmatched_symbol[-1] == close_symbols_dict[c]
+                        and unmatched_symbol[-1] == self._close_symbols_dict[c]
                     ):
                         unmatched_symbol.pop()
-
                 # By default, the current sentence ends when a newline-like character appears
-                if c in self.line_break_characters:
+                else:
                     unmatched_symbol = []
+                    cur_sentences += sent[pos : match.start()]
+                    pos = match.start()
                     if cur_sentences.strip():
                         new_sentences.append(cur_sentences)
                         cur_sentences = ""
-                cur_sentences += c
+            cur_sentences += sent[pos:]
 
         if cur_sentences:
             new_sentences.append(cur_sentences)
@@ -555,68 +594,20 @@ class TokenParagraphSplitter(TextSplitter):
         if not sentences:
             return []
 
-        n_tokens = [
-            len(
-                self._tokenizer.encode(
-                    sentence,
-                    allowed_special=self._allowed_special,
-                    disallowed_special=self._disallowed_special,
-                )
-            )
-            for sentence in sentences
-        ]
+        n_tokens = _count_tokens(
+            self._tokenizer, sentences, self._allowed_special, self._disallowed_special
+        )
 
         chunks = []
-        start_idx = 0
-        end_idx = start_idx + 1
-        cur_token_num = n_tokens[start_idx]
-        while start_idx < len(n_tokens):
-            # Tail reaches the end point,
-            if end_idx >= len(n_tokens):
-                chunk = "".join(sentences[start_idx:end_idx])
-                logging.debug(
-                    "sentences[%s:%s] merged into chunk, current num_tokens: %s(%s)",
-                    start_idx,
-                    end_idx,
-                    sum(n_tokens[start_idx:end_idx]),
-                    cur_token_num,
-                )
-                chunks.append(chunk)
-                break
-            else:
-                # +The next sentence will not exceed chunk_size, continue to include new sentences
-                if cur_token_num + n_tokens[end_idx] <= self._chunk_size:
-                    cur_token_num += n_tokens[end_idx]
-                    end_idx += 1
-                # +The next sentence will exceed chunk_size, assemble the current chunk and move to the next chunk
-                else:
-                    chunk = "".join(sentences[start_idx:end_idx])
-                    logging.debug(
-                        "sentences[%s:%s] merged into chunk, current num_tokens: %s(%s)",
-                        start_idx,
-                        end_idx,
-                        sum(n_tokens[start_idx:end_idx]),
-                        cur_token_num,
-                    )
-                    chunks.append(chunk)
-                    # Next chunk: idx moves at least one position forward, start_idx allows overlap
-                    end_idx = end_idx + 1
-                    # Find a new starting point for start_idx that doesn't exceed the overlap
-                    new_start_idx = end_idx - 1
-                    overlap = 0
-                    new_cur_token_num = n_tokens[new_start_idx]
-                    while new_start_idx > start_idx + 1:
-                        if (
-                            overlap + n_tokens[new_start_idx - 1] >= self._chunk_overlap
-                            or new_cur_token_num >= self._chunk_size
-                        ):
-                            break
-                        new_start_idx -= 1
-                        overlap += n_tokens[new_start_idx]
-                        new_cur_token_num += n_tokens[new_start_idx]
-
-                    start_idx = new_start_idx
-                    cur_token_num = new_cur_token_num
+        for start_idx, end_idx, num_tokens in self._pack_sentence_spans(n_tokens):
+            logging.debug(
+                "sentences[%s:%s] merged into chunk, current num_tokens: %s",
+                start_idx,
+                end_idx,
+                num_tokens,
+            )
+            chunks.append("".join(sentences[start_idx:end_idx]))
+
         if len(chunks) > 1 and len(chunks[-1]) < min_chunk_size:
             logging.warning(
                 "The last chunk length %s is less than %s, merge with the previous chunk",
@@ -630,6 +621,37 @@ class TokenParagraphSplitter(TextSplitter):
 
         return chunks
 
+    def _pack_sentence_spans(self, n_tokens: List[int]) -> List[Tuple[int, int, int]]:
+        """Greedily pack sentences into (start_idx, end_idx, num_tokens) spans using only their token counts"""
+        chunk_size, chunk_overlap = self._chunk_size, self._chunk_overlap
+        n_sentences = len(n_tokens)
+        # prefix[i] is the token count of sentences[:i], so any span's size is one subtraction
+        prefix = [0, *accumulate(n_tokens)]
+        spans = []
+        start_idx = 0
+        end_idx = start_idx + 1
+        while True:
+            # Include as many following sentences as fit in chunk_size, found by bisecting instead of one by one;
+            # a chunk always keeps at least the sentences it starts with
+            furthest_idx = bisect_right(prefix, prefix[start_idx] + chunk_size, end_idx) - 1
+            end_idx = min(max(end_idx, furthest_idx), n_sentences)
+            spans.append((start_idx, end_idx, prefix[end_idx] - prefix[start_idx]))
+            # Tail reaches the end point
+            if end_idx >= n_sentences:
+                return spans
+            # Next chunk: idx moves at least one position forward, start_idx allows overlap
+            new_start_idx = end_idx
+            end_idx += 1
+            # Find a new starting point for start_idx that doesn't exceed the overlap
+            while new_start_idx > start_idx + 1:
+                if (
+                    prefix[end_idx - 1] - prefix[new_start_idx - 1] >= chunk_overlap
+                    or prefix[end_idx] - prefix[new_start_idx] >= chunk_size
+                ):
+                    break
+                new_start_idx -= 1
+            start_idx = new_start_idx
+
     def _force_split_to_chunks(
         self, text: str, url_strings: List[str] = []
     ) -> List[str]:
@@ -708,16 +730,22 @@ class TokenParagraphSplitter(TextSplitter):
         return _splits
 
 
+def json_loads(text):
+    # Prefer orjson when installed; its JSONDecodeError subclasses json.JSONDecodeError, so callers handle both alike
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
 def get_summarize_title_keywords(responses):
     # Clean LLM generated content to obtain summarized text titles, abstracts, and keywords
-    pattern = re.compile(r"\{.*(\}|\]|\,)", re.DOTALL)
     gen_texts = [each.choices[0].message.content for each in responses]
     logging.info("gen_texts: %s", gen_texts)
     results = []
     for res in gen_texts:
         try:
             # Match against the pattern
-            matches = list(pattern.finditer(res))
+            matches = list(_SUMMARY_JSON_PATTERN.finditer(res))
             if not matches:
                 results.append(("", "", []))
             else:
@@ -725,7 +753,7 @@ def get_summarize_title_keywords(responses):
                 content = answer.strip().strip(",")
                 content += "]" * (content.count("[") - content.count("]"))
                 content += "}" * (content.count("{") - content.count("}"))
-                d = json.loads(res)
+                d = json_loads(content)
                 results.append(
                     (d.get("title", ""), d.get("summary", ""), d.get("keywords", []))
                 )
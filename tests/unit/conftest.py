@@ -0,0 +1,13 @@
+import pytest
+
+from lpm_kernel.api.domains.trainprocess.trainprocess_service import TrainProcessService
+
+
+@pytest.fixture
+def train_service(tmp_path, monkeypatch):
+    """A fresh TrainProcessService whose progress file lives in a temporary directory"""
+    # Progress files are written below the working directory
+    monkeypatch.chdir(tmp_path)
+    # The service is a singleton, start from a new instance for every test
+    monkeypatch.setattr(TrainProcessService, "_instance", None)
+    return TrainProcessService("unit_test_model")
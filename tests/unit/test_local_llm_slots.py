@@ -0,0 +1,117 @@
+import gc
+import threading
+
+import pytest
+
+from lpm_kernel.api.common.errors import APIError, ErrorCodes
+from lpm_kernel.api.domains.kernel2.services.chat_service import ChatService
+from lpm_kernel.api.services.local_llm_service import LocalLLMService
+
+
+class FakeHttpResponse:
+    """Streaming HTTP response from llama-server"""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self.closed = False
+
+    def iter_lines(self):
+        yield from self._lines
+
+    def close(self):
+        self.closed = True
+
+
+SSE_LINES = [
+    'data: {"model":"gpt-3.5-turbo","choices":[{"index":0,"delta":{"content":"Hi"}}]}',
+    "",
+    "data: [DONE]",
+    "",
+]
+
+
+@pytest.fixture
+def service():
+    service = LocalLLMService()
+    # A single slot, so a leaked slot shows up as a timeout on the next request
+    service._inflight = threading.BoundedSemaphore(1)
+    service._slot_wait_timeout = 0.1
+    return service
+
+
+def _raw_stream_response(service, upstream):
+    # What chat_service.chat(..., raw_stream=True) hands to the chat routes
+    service.acquire_inference_slot()
+    return service.handle_raw_stream_response(service.hold_slot_for_stream(upstream))
+
+
+class TestInferenceSlots:
+    def test_slot_is_released_when_the_stream_is_never_read(self, service):
+        upstream = FakeHttpResponse(SSE_LINES)
+        response = _raw_stream_response(service, upstream)
+
+        # The client went away before the response was iterated
+        response.close()
+
+        assert upstream.closed
+        service.acquire_inference_slot()
+        service.release_inference_slot()
+
+    def test_slot_is_released_after_the_stream_is_read(self, service):
+        upstream = FakeHttpResponse(SSE_LINES)
+        response = _raw_stream_response(service, upstream)
+
+        body = b"".join(response.response)
+        response.close()
+
+        assert b'"model":"models/lpm"' in body
+        assert body.endswith(b"data: [DONE]\n\n")
+        assert upstream.closed
+        service.acquire_inference_slot()
+        service.release_inference_slot()
+
+    def test_waiting_for_a_slot_times_out_with_503(self, service):
+        service.acquire_inference_slot()
+        try:
+            with pytest.raises(APIError) as exc_info:
+                service.acquire_inference_slot()
+            assert exc_info.value.code == ErrorCodes.SERVICE_UNAVAILABLE
+            # The timed out request no longer counts as queued
+            assert service._pending_requests == 0
+        finally:
+            service.release_inference_slot()
+
+    def test_explicitly_passed_local_client_is_recognised(self, service):
+        local_client = object()
+        service._client = local_client
+
+        assert service.is_local_client(local_client)
+        assert not service.is_local_client(object())
+        assert not service.is_local_client(None)
+
+    def test_slot_is_released_when_the_consumer_fails(self, service, monkeypatch):
+        chat_service = ChatService()
+
+        def process_openai_response(chunk, full_response, full_content):
+            raise ValueError("malformed chunk")
+
+        monkeypatch.setattr(chat_service, "_process_openai_response", process_openai_response)
+        service.acquire_inference_slot()
+        stream = service.hold_slot_for_stream(iter([{"choices": []}]))
+
+        assert chat_service.collect_stream_response(stream) is None
+
+        service.acquire_inference_slot()
+        service.release_inference_slot()
+
+    def test_slot_is_released_when_the_stream_is_dropped(self, service):
+        service.acquire_inference_slot()
+        stream = service.hold_slot_for_stream(iter(["chunk"]))
+
+        # Dropped by a consumer that never closes it
+        next(stream)
+        del stream
+        gc.collect()
+
+        service.acquire_inference_slot()
+        service.release_inference_slot()
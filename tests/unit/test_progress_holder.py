@@ -0,0 +1,74 @@
+import json
+import time
+
+import pytest
+
+from lpm_kernel.api.domains.trainprocess import progress_holder
+from lpm_kernel.api.domains.trainprocess.process_step import ProcessStep
+from lpm_kernel.api.domains.trainprocess.progress_enum import Status
+from lpm_kernel.api.domains.trainprocess.progress_holder import TrainProgressHolder
+
+FLUSH_INTERVAL = 0.05
+
+
+@pytest.fixture
+def holder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(progress_holder, "BATCH_FLUSH_INTERVAL", FLUSH_INTERVAL)
+    holder = TrainProgressHolder("unit_test_model")
+    # Start from a progress file on disk
+    holder.reset_progress()
+    return holder
+
+
+def saved_status(holder, step: ProcessStep) -> str:
+    """Status of a step in the progress file on disk"""
+    with open(holder.progress_file) as f:
+        data = json.load(f)
+    for stage in data["stages"]:
+        for saved_step in stage["steps"]:
+            if saved_step["name"].lower().replace(" ", "_") == step.value:
+                return saved_step["status"]
+    raise KeyError(step.value)
+
+
+class TestBatchMode:
+    def test_non_terminal_status_is_written_when_the_batch_ends(self, holder):
+        with holder.batch_mode():
+            holder.mark_step_status(ProcessStep.LIST_DOCUMENTS, Status.IN_PROGRESS)
+            assert saved_status(holder, ProcessStep.LIST_DOCUMENTS) == "pending"
+        assert saved_status(holder, ProcessStep.LIST_DOCUMENTS) == "in_progress"
+
+    def test_terminal_status_is_written_at_once(self, holder):
+        with holder.batch_mode():
+            holder.mark_step_status(ProcessStep.LIST_DOCUMENTS, Status.IN_PROGRESS)
+            holder.mark_step_status(ProcessStep.MODEL_DOWNLOAD, Status.FAILED)
+            # The terminal change also flushes the deferred one
+            assert saved_status(holder, ProcessStep.MODEL_DOWNLOAD) == "failed"
+            assert saved_status(holder, ProcessStep.LIST_DOCUMENTS) == "in_progress"
+
+    def test_deferred_status_is_flushed_by_the_timer(self, holder):
+        with holder.batch_mode():
+            holder.mark_step_status(ProcessStep.LIST_DOCUMENTS, Status.IN_PROGRESS)
+            time.sleep(FLUSH_INTERVAL * 6)
+            assert saved_status(holder, ProcessStep.LIST_DOCUMENTS) == "in_progress"
+            assert holder._flush_timer is None
+
+    def test_reset_is_not_overwritten_by_a_pending_flush(self, holder):
+        with holder.batch_mode():
+            holder.mark_step_status(ProcessStep.LIST_DOCUMENTS, Status.IN_PROGRESS)
+            holder.reset_progress()
+            assert holder._flush_timer is None
+            time.sleep(FLUSH_INTERVAL * 6)
+            assert saved_status(holder, ProcessStep.LIST_DOCUMENTS) == "pending"
+        assert saved_status(holder, ProcessStep.LIST_DOCUMENTS) == "pending"
+
+    def test_stale_timer_keeps_the_current_timer(self, holder):
+        with holder.batch_mode():
+            holder.mark_step_status(ProcessStep.LIST_DOCUMENTS, Status.IN_PROGRESS)
+            current_timer = holder._flush_timer
+            # A flush from a timer that was already replaced must not drop the current one
+            holder._flush()
+            assert holder._flush_timer is current_timer
+            assert saved_status(holder, ProcessStep.LIST_DOCUMENTS) == "pending"
+        assert saved_status(holder, ProcessStep.LIST_DOCUMENTS) == "in_progress"
@@ -0,0 +1,69 @@
+import threading
+
+from lpm_kernel.api.domains.trainprocess.process_step import ProcessStep
+from lpm_kernel.api.domains.trainprocess.progress_enum import Status
+from lpm_kernel.api.domains.trainprocess.trainprocess_service import document_service
+
+DOC_IDS = list(range(1, 21))
+
+
+def _signal_on_failure(monkeypatch, service, step):
+    """Return an event that is set once step is marked failed"""
+    failed = threading.Event()
+    mark_step_status = service.progress.mark_step_status
+
+    def mark_and_signal(marked_step, status):
+        mark_step_status(marked_step, status)
+        if marked_step == step and status == Status.FAILED:
+            failed.set()
+
+    monkeypatch.setattr(service.progress, "mark_step_status", mark_and_signal)
+    return failed
+
+
+class TestDocumentEmbeddingPool:
+    def test_first_failure_cancels_pending_documents(self, train_service, monkeypatch):
+        monkeypatch.setenv("EMBED_CONCURRENCY", "1")
+        monkeypatch.setattr(document_service._repository, "find_unembedding_ids", lambda: DOC_IDS)
+        failed = _signal_on_failure(monkeypatch, train_service, ProcessStep.GENERATE_DOCUMENT_EMBEDDINGS)
+        started = []
+
+        def process_document_embedding(doc_id):
+            started.append(doc_id)
+            if doc_id == DOC_IDS[0]:
+                return None
+            # A document picked up before the failure was seen finishes only afterwards
+            failed.wait(5)
+            return [0.0]
+
+        monkeypatch.setattr(document_service, "process_document_embedding", process_document_embedding)
+
+        assert train_service.generate_document_embeddings() is False
+        assert failed.is_set()
+        # The failing document, and at most the one the worker had already picked up
+        assert started[0] == DOC_IDS[0]
+        assert len(started) <= 2
+
+
+class TestChunkEmbeddingPool:
+    def test_first_failure_cancels_pending_documents(self, train_service, monkeypatch):
+        monkeypatch.setenv("CONCURRENCY_THREADS", "1")
+        monkeypatch.setattr(train_service, "list_document_ids", lambda: DOC_IDS)
+        failed = _signal_on_failure(monkeypatch, train_service, ProcessStep.CHUNK_EMBEDDING)
+        started = []
+
+        def generate_document_chunk_embeddings(doc_id):
+            started.append(doc_id)
+            if doc_id == DOC_IDS[0]:
+                raise RuntimeError("embedding backend unavailable")
+            failed.wait(5)
+            return [object()]
+
+        monkeypatch.setattr(
+            document_service, "generate_document_chunk_embeddings", generate_document_chunk_embeddings
+        )
+
+        assert train_service.chunk_embedding() is False
+        assert failed.is_set()
+        assert started[0] == DOC_IDS[0]
+        assert len(started) <= 2
@@ -0,0 +1,58 @@
+import threading
+
+from lpm_kernel.api.domains.trainprocess.process_step import ProcessStep
+from lpm_kernel.api.domains.trainprocess.progress_enum import Status
+
+
+def _record_steps(monkeypatch, service, failing=()):
+    """Replace running a step with recording it; steps in failing fail, all others complete"""
+    ran = []
+    lock = threading.Lock()
+
+    def run_step(step):
+        with lock:
+            ran.append(step)
+        status = Status.FAILED if step in failing else Status.COMPLETED
+        service.progress.mark_step_status(step, status)
+        return status == Status.COMPLETED
+
+    monkeypatch.setattr(service, "_run_step", run_step)
+    return ran
+
+
+class TestResume:
+    def test_failed_download_reruns_after_later_steps_completed(self, train_service, monkeypatch):
+        # The download failed while the independent document steps went on and completed
+        train_service.progress.mark_step_status(ProcessStep.MODEL_DOWNLOAD, Status.FAILED)
+        for step in (ProcessStep.LIST_DOCUMENTS, ProcessStep.GENERATE_DOCUMENT_EMBEDDINGS):
+            train_service.progress.mark_step_status(step, Status.COMPLETED)
+        ran = _record_steps(monkeypatch, train_service)
+
+        assert train_service.start_process() is True
+
+        assert ProcessStep.MODEL_DOWNLOAD in ran
+        assert ProcessStep.LIST_DOCUMENTS not in ran
+        assert ProcessStep.GENERATE_DOCUMENT_EMBEDDINGS not in ran
+        # Steps that need the base model only start once it is downloaded
+        assert ran.index(ProcessStep.MODEL_DOWNLOAD) < ran.index(ProcessStep.MAP_ENTITY_NETWORK)
+        assert ran.index(ProcessStep.MODEL_DOWNLOAD) < ran.index(ProcessStep.TRAIN)
+
+    def test_force_reruns_completed_steps(self, train_service, monkeypatch):
+        for step in ProcessStep.get_ordered_steps():
+            train_service.progress.mark_step_status(step, Status.COMPLETED)
+        ran = _record_steps(monkeypatch, train_service)
+
+        assert train_service.start_process(force=True) is True
+
+        assert sorted(ran, key=lambda step: step.value) == sorted(
+            ProcessStep.get_ordered_steps(), key=lambda step: step.value
+        )
+
+    def test_failed_download_stops_dependent_steps(self, train_service, monkeypatch):
+        ran = _record_steps(monkeypatch, train_service, failing={ProcessStep.MODEL_DOWNLOAD})
+
+        assert train_service.start_process() is False
+
+        assert ProcessStep.MAP_ENTITY_NETWORK not in ran
+        assert ProcessStep.TRAIN not in ran
+        assert train_service.progress.is_step_completed(ProcessStep.MODEL_DOWNLOAD) is False